@@ -0,0 +1,132 @@
+import hashlib
+import os
+import random
+import re
+import string
+import sys
+import time
+from collections import Counter
+
+from strings.utils import _analyze_serial, compute_string_properties, compute_string_properties_parallel
+from strings.vectorized import compute_string_properties_vectorized, numpy_available
+
+
+def legacy_compute_string_properties(value):
+    """The multi-pass analyzer this service shipped with, kept for comparison."""
+    cleaned_value = re.sub(r'[^a-zA-Z0-9]', '', value.lower())
+    return {
+        'length': len(value),
+        'is_palindrome': cleaned_value == cleaned_value[::-1] if cleaned_value else False,
+        'unique_characters': len(set(value)),
+        'word_count': len(value.split()),
+        'sha256_hash': hashlib.sha256(value.encode('utf-8')).hexdigest(),
+        'character_frequency_map': dict(Counter(value))
+    }
+
+
+def make_text(size, unicode_text=False):
+    """Build a pseudo-random sentence-like string of roughly `size` characters."""
+    rng = random.Random(size)
+    alphabet = string.ascii_letters + string.digits
+    if unicode_text:
+        alphabet += 'éèüßøΩжя中文字😀'
+    words = []
+    total = 0
+    while total < size:
+        word = ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 9)))
+        words.append(word)
+        total += len(word) + 1
+    return ' '.join(words)[:size]
+
+
+def best_of(func, value, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(value)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_single_pass():
+    """Compare the legacy analyzer against the fused one at 1 KB, 1 MB and 50 MB."""
+    print("📊 compute_string_properties: legacy vs fused")
+    print("=" * 60)
+    print(f"{'input':<16}{'legacy (s)':>14}{'fused (s)':>14}{'speedup':>12}")
+    print("-" * 60)
+
+    for label, size, repeat in [("1 KB", 1_000, 200), ("1 MB", 1_000_000, 5), ("50 MB", 50_000_000, 1)]:
+        for unicode_text in (False, True):
+            value = make_text(size, unicode_text)
+            assert compute_string_properties(value) == legacy_compute_string_properties(value)
+
+            legacy = best_of(legacy_compute_string_properties, value, repeat)
+            fused = best_of(compute_string_properties, value, repeat)
+            name = f"{label} {'unicode' if unicode_text else 'ascii'}"
+            print(f"{name:<16}{legacy:>14.5f}{fused:>14.5f}{legacy / fused:>11.2f}x")
+
+
+def make_corpus(count):
+    """`count` short strings with a sprinkling of palindromes and Unicode."""
+    rng = random.Random(count)
+    vocabulary = ['racecar', 'level', 'hello', 'world', 'python', 'naïve', 'café', '中文', 'A man', 'a plan']
+    corpus = []
+    for _ in range(count):
+        words = rng.choices(vocabulary, k=rng.randint(1, 6))
+        corpus.append(' '.join(words))
+    return corpus
+
+
+def bench_vectorized():
+    """Compare the scalar analyzer loop against the NumPy path on 100k and 1M strings."""
+    print("📊 Bulk analysis: scalar loop vs NumPy vectorized")
+    print("=" * 60)
+    if not numpy_available():
+        print("NumPy is not installed; the vectorized path falls back to the scalar one.")
+        return
+    print(f"{'strings':<16}{'scalar (s)':>14}{'numpy (s)':>14}{'speedup':>12}")
+    print("-" * 60)
+
+    for count in (100_000, 1_000_000):
+        corpus = make_corpus(count)
+        scalar = best_of(lambda values: [compute_string_properties(v) for v in values], corpus, 1)
+        vectorized = best_of(compute_string_properties_vectorized, corpus, 1)
+        print(f"{count:<16,}{scalar:>14.3f}{vectorized:>14.3f}{scalar / vectorized:>11.2f}x")
+
+
+def bench_parallel():
+    """Scaling of intra-string parallel analysis with the number of processes."""
+    print("📊 Intra-string parallel analysis: 200 MB input by core count")
+    print("=" * 60)
+    value = make_text(200_000_000)
+    encoded = value.encode('utf-8')
+
+    start = time.perf_counter()
+    expected = _analyze_serial(value, encoded, hashlib.sha256(encoded).hexdigest())
+    serial = time.perf_counter() - start
+    print(f"{'processes':<16}{'time (s)':>14}{'speedup':>12}")
+    print("-" * 60)
+    print(f"{'serial':<16}{serial:>14.3f}{1:>11.2f}x")
+
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, 16, cpus} & set(range(1, cpus + 1)))
+    for processes in counts:
+        compute_string_properties_parallel('warm up the pool', processes)
+        start = time.perf_counter()
+        result = compute_string_properties_parallel(value, processes)
+        elapsed = time.perf_counter() - start
+        assert result == expected
+        print(f"{processes:<16}{elapsed:>14.3f}{serial / elapsed:>11.2f}x")
+
+
+BENCHMARKS = {
+    'single': bench_single_pass,
+    'vectorized': bench_vectorized,
+    'parallel': bench_parallel,
+}
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        BENCHMARKS[name]()
+        print()
@@ -0,0 +1,133 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+# A throwaway SQLite database, so the benchmark never touches db.sqlite3
+_directory = tempfile.TemporaryDirectory()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_directory.name, 'benchmark.sqlite3')}"
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'string_analyzer_service.settings')
+
+import django
+
+django.setup()
+
+from django.core.management import call_command
+from rest_framework.renderers import JSONRenderer
+
+from strings.frequency import pack_frequency_map
+from strings.models import StringAnalysis
+from strings import fast_serializer
+from strings.fast_serializer import FULL_COLUMNS, render_rows
+from strings.rendered import RENDERED_COLUMNS, rendered_payloads, splice_response
+from strings.serializers import StringAnalysisSerializer
+from strings.utils import compute_string_properties
+
+
+def make_rows(count):
+    """Store `count` sentence-like strings of 10-200 characters."""
+    rng = random.Random(count)
+    vocabulary = ['racecar', 'level', 'hello', 'world', 'python', 'naïve', 'café', '中文', 'A man', 'a plan']
+    stored = StringAnalysis.objects.count()
+    while stored < count:
+        value = ' '.join(rng.choices(vocabulary, k=rng.randint(2, 30))) + f' {stored}'
+        StringAnalysis.create_from_properties(value, compute_string_properties(value))
+        stored += 1
+
+
+def bulk_rows(count):
+    """Store `count` rows quickly: bulk inserts, no character index."""
+    rng = random.Random(count)
+    vocabulary = ['racecar', 'level', 'hello', 'world', 'python', 'naïve', 'café', '中文', 'A man', 'a plan']
+    stored = StringAnalysis.objects.count()
+    while stored < count:
+        batch = []
+        for index in range(stored, min(count, stored + 5_000)):
+            value = ' '.join(rng.choices(vocabulary, k=rng.randint(2, 30))) + f' {index}'
+            properties = compute_string_properties(value)
+            batch.append(StringAnalysis(
+                id=properties['sha256_hash'],
+                value=value,
+                length=properties['length'],
+                is_palindrome=properties['is_palindrome'],
+                unique_characters=properties['unique_characters'],
+                word_count=properties['word_count'],
+                character_frequency_data=pack_frequency_map(properties['character_frequency_map']),
+            ))
+        StringAnalysis.objects.bulk_create(batch)
+        stored += len(batch)
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def drf_body(count):
+    rows = list(StringAnalysis.objects.all()[:count])
+    return JSONRenderer().render({'data': StringAnalysisSerializer(rows, many=True).data, 'count': count})
+
+
+def prerendered_body(count):
+    rows = list(StringAnalysis.objects.values_list(*RENDERED_COLUMNS, named=True)[:count])
+    return splice_response(rendered_payloads(rows), {'count': count})
+
+
+def fast_body(count):
+    rows = list(StringAnalysis.objects.values_list(*FULL_COLUMNS, named=True)[:count])
+    return splice_response(render_rows(rows), {'count': count})
+
+
+def bench_prerendered():
+    """Rows per second of a list body: DRF serializer + renderer against
+    splicing the stored rendered_json, database read included."""
+    print("📊 List response body: DRF serializer vs pre-rendered rows")
+    print("=" * 60)
+    call_command('migrate', verbosity=0)
+    print(f"{'rows':<16}{'DRF (rows/s)':>14}{'stored (rows/s)':>17}{'speedup':>12}")
+    print("-" * 60)
+
+    for count in (100, 1_000, 10_000):
+        make_rows(count)
+        # First read renders and stores every row; time the steady state
+        assert prerendered_body(count) == drf_body(count)
+        repeat = max(3, 30_000 // count)
+        drf = best_of(lambda: drf_body(count), repeat)
+        stored = best_of(lambda: prerendered_body(count), repeat)
+        print(f"{count:<16,}{count / drf:>14,.0f}{count / stored:>17,.0f}{drf / stored:>11.2f}x")
+
+
+def bench_fast():
+    """Rows per second of a list body rendered from scratch: model instances
+    through the DRF serializer and renderer against values_list() rows
+    through fast_serializer, database read included."""
+    print("📊 List response body: DRF serializer vs values_list() rows")
+    print(f"   encoder: {'orjson' if fast_serializer.orjson is not None else 'json (stdlib)'}")
+    print("=" * 60)
+    call_command('migrate', verbosity=0)
+    print(f"{'rows':<16}{'DRF (rows/s)':>14}{'fast (rows/s)':>17}{'speedup':>12}")
+    print("-" * 60)
+
+    for count in (50, 1_000, 100_000):
+        bulk_rows(count)
+        assert fast_body(count) == drf_body(count)
+        repeat = max(3, 30_000 // count)
+        drf = best_of(lambda: drf_body(count), repeat)
+        fast = best_of(lambda: fast_body(count), repeat)
+        print(f"{count:<16,}{count / drf:>14,.0f}{count / fast:>17,.0f}{drf / fast:>11.2f}x")
+
+
+BENCHMARKS = {
+    'prerendered': bench_prerendered,
+    'fast': bench_fast,
+}
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        BENCHMARKS[name]()
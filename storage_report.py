@@ -0,0 +1,122 @@
+import json
+import os
+import random
+import sqlite3
+import tempfile
+
+from strings.frequency import fold_frequency_map, pack_frequency_map
+from strings.utils import character_class_mask, compute_string_properties
+
+# The original layout, and the current one: the compact frequency map plus
+# what later features store per row (the character mask and rendered JSON)
+# and the character index table
+OLD_SCHEMA = """
+CREATE TABLE string_analysis (
+    id varchar(64) PRIMARY KEY, value text, length integer, is_palindrome bool,
+    unique_characters integer, word_count integer, created_at datetime,
+    sha256_hash varchar(64), character_frequency_map text
+);"""
+NEW_SCHEMA = """
+CREATE TABLE string_analysis (
+    id varchar(64) PRIMARY KEY, value text, length integer, is_palindrome bool,
+    unique_characters integer, word_count integer, created_at datetime,
+    character_frequency_data blob, frequency_map_mode varchar(8),
+    character_mask bigint, rendered_json blob
+);
+CREATE TABLE string_character (
+    id integer PRIMARY KEY, string_id varchar(64), character varchar(1), count integer,
+    UNIQUE (string_id, character)
+);
+CREATE INDEX string_character_count_idx ON string_character (character, count, string_id);"""
+
+
+def make_corpus(count=20000):
+    """A mix of what the service sees: short words and palindromes, English
+    sentences, CJK text and emoji-heavy log lines of varying length."""
+    rng = random.Random(42)
+    english = ('the quick brown fox jumps over lazy dog string analyzer service '
+               'hello world python django palindrome racecar level').split()
+    cjk = [chr(rng.randint(0x4e00, 0x9fff)) for _ in range(3000)]
+    emoji = [chr(rng.randint(0x1f300, 0x1f64f)) for _ in range(200)]
+
+    corpus = set()
+    while len(corpus) < count:
+        kind = rng.random()
+        if kind < 0.3:
+            corpus.add(rng.choice(english) + str(rng.randint(0, 10 ** 6)))
+        elif kind < 0.7:
+            corpus.add(' '.join(rng.choices(english, k=rng.randint(3, 60))))
+        elif kind < 0.9:
+            corpus.add(''.join(rng.choices(cjk, k=rng.randint(10, 2000))))
+        else:
+            corpus.add(' '.join(
+                rng.choice(english) + ''.join(rng.choices(emoji, k=rng.randint(1, 4)))
+                for _ in range(rng.randint(2, 40))
+            ))
+    return sorted(corpus)
+
+
+def database_bytes(schema, tables):
+    """Size of a vacuumed SQLite file holding tables ({name: rows})."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'report.sqlite3')
+        connection = sqlite3.connect(path)
+        connection.executescript(schema)
+        for table, rows in tables.items():
+            placeholders = ', '.join('?' * len(rows[0]))
+            connection.executemany(f'INSERT INTO {table} VALUES ({placeholders})', rows)
+        connection.commit()
+        connection.execute('VACUUM')
+        connection.close()
+        return os.path.getsize(path)
+
+
+def rendered_json(p, created_at):
+    """What strings.rendered stores: the row's JSON without id and value."""
+    data = {'properties': p, 'created_at': created_at}
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def storage_report():
+    print("📦 STORAGE REPORT: bytes per row, old vs current layout")
+    print("=" * 60)
+    corpus = make_corpus()
+    old_rows, new_rows, character_rows = [], [], []
+    old_columns = new_columns = rendered_bytes = 0
+
+    for value in corpus:
+        p = compute_string_properties(value)
+        common = (p['sha256_hash'], value, p['length'], p['is_palindrome'],
+                  p['unique_characters'], p['word_count'], '2025-10-22 07:39:00')
+        frequency_json = json.dumps(p['character_frequency_map'])
+        frequency_packed = pack_frequency_map(p['character_frequency_map'])
+        rendered = rendered_json(p, '2025-10-22T07:39:00Z')
+
+        old_rows.append(common + (p['sha256_hash'], frequency_json))
+        new_rows.append(common + (
+            frequency_packed, 'exact', character_class_mask(p['character_frequency_map']), rendered,
+        ))
+        for char, count in fold_frequency_map(p['character_frequency_map']).items():
+            character_rows.append((len(character_rows) + 1, p['sha256_hash'], char, count))
+        old_columns += len(p['sha256_hash']) + len(frequency_json.encode('utf-8'))
+        new_columns += len(frequency_packed)
+        rendered_bytes += len(rendered)
+
+    rows = len(corpus)
+    old_file = database_bytes(OLD_SCHEMA, {'string_analysis': old_rows})
+    new_file = database_bytes(NEW_SCHEMA, {'string_analysis': new_rows, 'string_character': character_rows})
+    index_file = database_bytes(NEW_SCHEMA, {'string_analysis': new_rows[:1], 'string_character': character_rows})
+
+    print(f"Corpus: {rows:,} strings, {len(character_rows):,} character index rows")
+    print(f"{'':<34}{'old':>10}{'new':>10}{'change':>8}")
+    print("-" * 60)
+    print(f"{'hash + frequency map columns':<34}{old_columns / rows:>10.1f}{new_columns / rows:>10.1f}"
+          f"{new_columns / old_columns - 1:>+8.0%}")
+    print(f"{'rendered_json column':<34}{0:>10.1f}{rendered_bytes / rows:>10.1f}")
+    print(f"{'string_character table + index':<34}{0:>10.1f}{index_file / rows:>10.1f}")
+    print(f"{'SQLite file (all tables + indexes)':<34}{old_file / rows:>10.1f}{new_file / rows:>10.1f}"
+          f"{new_file / old_file - 1:>+8.0%}")
+
+
+if __name__ == "__main__":
+    storage_report()
@@ -144,3 +144,66 @@ REST_FRAMEWORK = {
 
 
 APPEND_SLASH = False
+
+
+# Raw text uploads to POST /strings are read and analyzed in chunks of this
+# many bytes; spooled data moves from memory to a temp file past the max size.
+STRING_STREAM_CHUNK_SIZE = 64 * 1024
+STRING_STREAM_SPOOL_MAX_SIZE = 1024 * 1024
+
+# Byte budget for the per-process LRU of computed string properties.
+STRING_PROPERTIES_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Threads that complete rows for POST /strings?properties=... requests.
+STRING_BACKGROUND_WORKERS = 2
+
+# Largest value (UTF-8 bytes) an append hashes during the request when its
+# saved SHA-256 state is not there yet (about 70 ms at this size).
+STRING_APPEND_INLINE_HASH_BYTES = 16 * 1024
+
+# Largest {"values": [...]} batch accepted by POST /analyze.
+STRING_ANALYZE_MAX_BATCH = 10000
+
+# Storage/response form of character_frequency_map: 'exact', 'top_k' (top K
+# characters plus an "other" bucket) or 'sketch' (top K plus a count-min
+# sketch of the rest). Maps with at most TOP_K characters are always exact.
+STRING_FREQUENCY_MAP_MODE = os.environ.get('STRING_FREQUENCY_MAP_MODE', 'exact')
+STRING_FREQUENCY_MAP_TOP_K = 256
+STRING_FREQUENCY_SKETCH_WIDTH = 256
+STRING_FREQUENCY_SKETCH_DEPTH = 4
+
+# Largest ?limit= accepted by the paginated list and natural-language endpoints.
+STRING_MAX_PAGE_SIZE = 500
+
+# Rows fetched per database round trip by ?stream=true list responses.
+STRING_EXPORT_CHUNK_SIZE = 500
+
+# ?count=estimate on databases without planner row estimates counts at most
+# this many matches.
+STRING_COUNT_ESTIMATE_LIMIT = 10000
+
+# Cache (a CACHES alias) and lifetime in seconds for list and natural-language
+# responses. Any write invalidates them; point the alias at a shared backend
+# to share entries between workers.
+STRING_RESULT_CACHE_ALIAS = 'default'
+STRING_RESULT_CACHE_TIMEOUT = 300
+
+# Cache-Control max-age in seconds of GET /strings/{value} responses; a stored
+# analysis never changes, it can only be deleted.
+STRING_DETAIL_CACHE_MAX_AGE = 24 * 60 * 60
+
+# Per-process LRU of rendered GET /strings/{value} bodies: byte budget, and
+# seconds an entry is kept. A delete made by another worker is only seen
+# once the entry expires, so other workers can serve the deleted string for
+# this long; keep it short.
+STRING_DETAIL_PAYLOAD_CACHE_MAX_BYTES = 16 * 1024 * 1024
+STRING_DETAIL_PAYLOAD_CACHE_MAX_AGE = 5
+
+# Cross-worker tier behind that LRU: a file of SLOTS fixed-size slots that
+# every worker on the node maps (put it on tmpfs, e.g. /dev/shm). Unset
+# disables it. The path is a prefix; the file name ends in
+# .<SLOTS>x<SLOT_SIZE>, so changing either starts a new file. Entries
+# outlive worker restarts; remove the file if the database is replaced.
+STRING_SHARED_CACHE_PATH = os.environ.get('STRING_SHARED_CACHE_PATH')
+STRING_SHARED_CACHE_SLOTS = 8192
+STRING_SHARED_CACHE_SLOT_SIZE = 4096
@@ -0,0 +1,233 @@
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .shared_cache import SharedPayloadCache, shared_cache_available
+from .utils import PROPERTY_NAMES, analyze_encoded, compute_string_properties
+
+
+def estimate_properties_size(properties: Dict[str, Any]) -> int:
+    """Approximate memory held by a property dict, in bytes.
+
+    The frequency map dominates for large alphabets, so it is measured key
+    by key; the scalar fields are covered by the size of the outer dict.
+    """
+    frequency_map = properties['character_frequency_map']
+    size = sys.getsizeof(properties) + sys.getsizeof(properties['sha256_hash'])
+    size += sys.getsizeof(frequency_map)
+    for char, count in frequency_map.items():
+        size += sys.getsizeof(char) + sys.getsizeof(count)
+    return size
+
+
+class LRUCache:
+    """Byte-bounded LRU keyed by SHA-256 hex digest.
+
+    Subclasses say how big a value is. Entries older than max_age seconds,
+    when given, count as misses. Cached values are shared between callers
+    and must not be mutated.
+    """
+
+    def __init__(self, max_bytes: int, max_age: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def sizeof(self, value: Any) -> int:
+        raise NotImplementedError
+
+    def get(self, sha256_hash: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(sha256_hash)
+            if entry is not None and entry[2] is not None and entry[2] < time.monotonic():
+                self._remove(sha256_hash)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(sha256_hash)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, sha256_hash: str, value: Any) -> None:
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        expires = time.monotonic() + self.max_age if self.max_age is not None else None
+        with self._lock:
+            self._remove(sha256_hash)
+            self._entries[sha256_hash] = (value, size, expires)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def delete(self, sha256_hash: str) -> None:
+        with self._lock:
+            self._remove(sha256_hash)
+
+    def _remove(self, sha256_hash: str) -> None:
+        previous = self._entries.pop(sha256_hash, None)
+        if previous is not None:
+            self.current_bytes -= previous[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+
+
+class PropertiesCache(LRUCache):
+    """Computed properties dicts, keyed by the digest of their value."""
+
+    def sizeof(self, properties: Dict[str, Any]) -> int:
+        return estimate_properties_size(properties)
+
+
+class PayloadCache(LRUCache):
+    """(ETag, rendered JSON body) of detail responses, keyed by row id.
+
+    Rows never change under their id, so an entry only goes stale when the
+    row is deleted or appended to. The worker that does that drops it at
+    once; max_age bounds how long other workers can keep serving it.
+    """
+
+    def sizeof(self, entry: Tuple[str, bytes]) -> int:
+        etag, payload = entry
+        return sys.getsizeof(etag) + sys.getsizeof(payload)
+
+
+properties_cache = PropertiesCache(settings.STRING_PROPERTIES_CACHE_MAX_BYTES)
+detail_cache = PayloadCache(settings.STRING_DETAIL_PAYLOAD_CACHE_MAX_BYTES, settings.STRING_DETAIL_PAYLOAD_CACHE_MAX_AGE)
+
+# Second tier behind detail_cache, shared by the workers on a node
+shared_detail_cache = None
+if settings.STRING_SHARED_CACHE_PATH and shared_cache_available():
+    shared_detail_cache = SharedPayloadCache(
+        settings.STRING_SHARED_CACHE_PATH,
+        settings.STRING_SHARED_CACHE_SLOTS,
+        settings.STRING_SHARED_CACHE_SLOT_SIZE,
+    )
+
+
+def get_detail_payload(analysis_id: str) -> Optional[Tuple[str, bytes]]:
+    """Cached (ETag, detail body) for analysis_id from this worker's LRU,
+    else from the shared tier (copying it into the LRU)."""
+    entry = detail_cache.get(analysis_id)
+    if entry is None and shared_detail_cache is not None:
+        # The shared tier holds bytes: the ETag, a newline, then the body
+        stored = shared_detail_cache.get(analysis_id)
+        if stored is not None:
+            etag, _, payload = stored.partition(b'\n')
+            entry = (etag.decode('ascii'), payload)
+            detail_cache.put(analysis_id, entry)
+    return entry
+
+
+def put_detail_payload(analysis_id: str, etag: str, payload: bytes) -> None:
+    detail_cache.put(analysis_id, (etag, payload))
+    if shared_detail_cache is not None:
+        shared_detail_cache.put(analysis_id, etag.encode('ascii') + b'\n' + payload)
+
+
+def delete_detail_payload(analysis_id: str) -> None:
+    """Drop analysis_id from this worker's LRU and, for every worker, from
+    the shared tier."""
+    detail_cache.delete(analysis_id)
+    if shared_detail_cache is not None:
+        shared_detail_cache.delete(analysis_id)
+
+
+def compute_string_properties_cached(value: str, properties: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """compute_string_properties() memoized on the SHA-256 of value.
+
+    A subset of properties is served from a cached full entry when there is
+    one; otherwise only the subset is computed, and it is not cached.
+    """
+    encoded = value.encode('utf-8')
+    sha256_hash = hashlib.sha256(encoded).hexdigest()
+
+    cached = properties_cache.get(sha256_hash)
+    if properties is not None:
+        if cached is not None:
+            return {name: cached[name] for name in PROPERTY_NAMES if name in properties}
+        return compute_string_properties(value, properties)
+
+    if cached is None:
+        cached = analyze_encoded(value, encoded, sha256_hash)
+        properties_cache.put(sha256_hash, cached)
+    return cached
+
+
+class ResultCache:
+    """List and natural-language responses in a Django cache, keyed by the
+    request's query parameters and the current CollectionVersion.
+
+    Writes bump the version rather than deleting entries, so every worker
+    stops using old results at once and stale entries expire on their own.
+    Use a shared cache backend for the entries themselves to be shared
+    between workers too; the hit and miss counts are per process.
+    """
+
+    def __init__(self, alias: str, timeout: int):
+        self.alias = alias
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, request, version: int) -> str:
+        """Cache key for request's results at CollectionVersion version."""
+        params = sorted((name, value) for name, values in request.GET.lists() for value in values)
+        normalized = repr((request.get_host(), request.path, request.accepted_renderer.format, params))
+        digest = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        return f'strings:results:{version}:{digest}'
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        data = caches[self.alias].get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def set(self, key: str, data: Dict[str, Any]) -> None:
+        caches[self.alias].set(key, data, self.timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+
+
+result_cache = ResultCache(settings.STRING_RESULT_CACHE_ALIAS, settings.STRING_RESULT_CACHE_TIMEOUT)
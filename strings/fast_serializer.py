@@ -0,0 +1,126 @@
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from django.utils import timezone
+from rest_framework import serializers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .frequency import frequency_map_properties, unpack_frequency_map
+from .models import StringAnalysis
+from .serializers import FIELD_COLUMNS
+from .utils import PROPERTY_NAMES
+
+# StringAnalysisSerializer output built straight from .values_list() rows:
+# no model instances, no serializer fields, and orjson when it is installed.
+# The bytes are identical to StringAnalysisSerializer + JSONRenderer.
+
+# Columns of a whole row; id and created_at come first, as they do for
+# projections, so pagination reads them the same way
+FULL_COLUMNS = (
+    'id', 'created_at', 'value', 'length', 'is_palindrome', 'unique_characters', 'word_count',
+    'character_frequency_data', 'frequency_map_mode', 'frequency_map_tail',
+)
+
+_created_at = serializers.DateTimeField()
+
+
+def row_columns(fields: Optional[List[str]] = None) -> tuple:
+    """Columns to pass to values_list(named=True) for row_data(row, fields)."""
+    if fields is None:
+        return FULL_COLUMNS
+    columns = dict.fromkeys(('id', 'created_at'))
+    for name in fields:
+        columns.update(dict.fromkeys(FIELD_COLUMNS[name]))
+    return tuple(columns)
+
+
+def _is_palindrome(row) -> bool:
+    if row.is_palindrome is None:
+        return StringAnalysis.store_is_palindrome(row.id, getattr(row, 'value', None))
+    return row.is_palindrome
+
+
+def row_data(row, fields: Optional[List[str]] = None, created_at=_created_at) -> Dict[str, Any]:
+    """StringAnalysisSerializer(fields=fields).data of a values_list row.
+
+    created_at is the DateTimeField that formats the timestamp; see
+    row_renderer().
+    """
+    if fields is None:
+        return {
+            'id': row.id,
+            'value': row.value,
+            'properties': {
+                'length': row.length,
+                'is_palindrome': _is_palindrome(row),
+                'unique_characters': row.unique_characters,
+                'word_count': row.word_count,
+                'sha256_hash': row.id,
+                **frequency_map_properties(
+                    unpack_frequency_map(row.character_frequency_data),
+                    row.frequency_map_mode,
+                    row.frequency_map_tail,
+                ),
+            },
+            'created_at': created_at.to_representation(row.created_at),
+        }
+
+    data = {}
+    if 'id' in fields:
+        data['id'] = row.id
+    if 'value' in fields:
+        data['value'] = row.value
+    properties = {}
+    for name in PROPERTY_NAMES:
+        if name not in fields:
+            continue
+        if name == 'is_palindrome':
+            properties[name] = _is_palindrome(row)
+        elif name == 'sha256_hash':
+            properties[name] = row.id
+        elif name == 'character_frequency_map':
+            properties.update(frequency_map_properties(
+                unpack_frequency_map(row.character_frequency_data),
+                row.frequency_map_mode,
+                row.frequency_map_tail,
+            ))
+        else:
+            properties[name] = getattr(row, name)
+    if properties:
+        data['properties'] = properties
+    if 'created_at' in fields:
+        data['created_at'] = created_at.to_representation(row.created_at)
+    return data
+
+
+def dumps(data: Any) -> bytes:
+    """JSON bytes as JSONRenderer writes them (compact, UTF-8, U+2028 and
+    U+2029 escaped) for the plain dicts, lists, strings and ints here."""
+    if orjson is not None:
+        encoded = orjson.dumps(data)
+    else:
+        encoded = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+    if b'\xe2\x80' in encoded:
+        encoded = encoded.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return encoded
+
+
+def row_renderer(fields: Optional[List[str]] = None) -> Callable[[Any], bytes]:
+    """Function from a values_list(*row_columns(fields), named=True) row to
+    its JSON.
+
+    The timestamp field is bound to the active time zone once, rather than
+    DRF looking the zone up again for every row.
+    """
+    created_at = serializers.DateTimeField(default_timezone=timezone.get_current_timezone())
+    return lambda row: dumps(row_data(row, fields, created_at))
+
+
+def render_rows(rows: Iterable, fields: Optional[List[str]] = None) -> List[bytes]:
+    """JSON of each values_list(*row_columns(fields), named=True) row."""
+    render = row_renderer(fields)
+    return [render(row) for row in rows]
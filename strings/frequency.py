@@ -0,0 +1,164 @@
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+
+# How character_frequency_map is stored:
+#   exact  - every character with its exact count
+#   top_k  - the K most frequent characters exactly, the rest summed into an
+#            "other" bucket
+#   sketch - top_k plus a count-min sketch that estimates any tail count,
+#            returned to clients in the tail (character counts in filters
+#            come from the exact character index instead)
+FREQUENCY_MAP_MODES = ('exact', 'top_k', 'sketch')
+
+# (a, b) pairs for the count-min row hashes ((a * codepoint + b) mod p) mod width
+_SKETCH_PRIME = 2 ** 31 - 1
+_SKETCH_HASHES = (
+    (1103515245, 12345),
+    (2147483629, 7654321),
+    (1664525, 1013904223),
+    (22695477, 1),
+    (134775813, 97),
+    (69069, 362437),
+    (214013, 2531011),
+    (1140671485, 12820163),
+)
+
+
+def _sketch_slot(char: str, row: int, width: int) -> int:
+    a, b = _SKETCH_HASHES[row]
+    return ((a * ord(char) + b) % _SKETCH_PRIME) % width
+
+
+def build_count_min_sketch(counts: Dict[str, int], width: int, depth: int) -> Dict[str, Any]:
+    """Count-min sketch over single-character keys, as a JSON-friendly dict.
+
+    The dict carries its hash parameters, so clients can look a character
+    up: row r counts it in slot ((a * codepoint + b) % prime) % width, with
+    (a, b) = hashes[r], and the estimate is the smallest of those slots.
+    """
+    if not 1 <= depth <= len(_SKETCH_HASHES):
+        raise ValueError(f'Sketch depth must be between 1 and {len(_SKETCH_HASHES)}')
+    table = [[0] * width for _ in range(depth)]
+    for char, count in counts.items():
+        for row in range(depth):
+            table[row][_sketch_slot(char, row, width)] += count
+    return {
+        'width': width,
+        'depth': depth,
+        'prime': _SKETCH_PRIME,
+        'hashes': [list(pair) for pair in _SKETCH_HASHES[:depth]],
+        'table': table,
+    }
+
+
+def compact_frequency_map(
+    character_frequency_map: Dict[str, int],
+    mode: str,
+    top_k: int,
+    sketch_width: int = 256,
+    sketch_depth: int = 4,
+) -> Tuple[Dict[str, int], str, Optional[Dict[str, Any]]]:
+    """Reduce a frequency map for storage according to mode.
+
+    Returns (map, mode actually used, tail). Maps with at most top_k
+    characters are kept exact whatever the mode, and their tail is None.
+    """
+    if mode not in FREQUENCY_MAP_MODES:
+        raise ValueError(f'Unknown frequency map mode: {mode!r}')
+    if mode == 'exact' or len(character_frequency_map) <= top_k:
+        return character_frequency_map, 'exact', None
+
+    # sorted() is stable, so ties keep first-occurrence order
+    ranked = sorted(character_frequency_map.items(), key=lambda item: -item[1])
+    head = dict(ranked[:top_k])
+    rest = dict(ranked[top_k:])
+
+    tail = {'other': sum(rest.values()), 'other_unique': len(rest)}
+    if mode == 'sketch':
+        tail['sketch'] = build_count_min_sketch(rest, sketch_width, sketch_depth)
+    return head, mode, tail
+
+
+def fold_character(char: str) -> str:
+    """Case-folded form used by the character index (matches icontains)."""
+    lowered = char.lower()
+    return lowered if len(lowered) == 1 else char
+
+
+def fold_frequency_map(character_frequency_map: Dict[str, int]) -> Dict[str, int]:
+    """Frequency map with the counts of case variants added together."""
+    folded = {}
+    for char, count in character_frequency_map.items():
+        char = fold_character(char)
+        folded[char] = folded.get(char, 0) + count
+    return folded
+
+
+def _write_varint(out: bytearray, number: int) -> None:
+    while number > 0x7f:
+        out.append((number & 0x7f) | 0x80)
+        number >>= 7
+    out.append(number)
+
+
+def pack_frequency_map(character_frequency_map: Dict[str, int]) -> bytes:
+    """Encode a frequency map as (codepoint, count) LEB128 varint pairs.
+
+    Pairs keep the map's order (first occurrence), so unpacking gives back
+    an identical dict. ASCII maps take 2 bytes per character for counts
+    below 128, against ~8 as JSON text.
+    """
+    out = bytearray()
+    for char, count in character_frequency_map.items():
+        _write_varint(out, ord(char))
+        _write_varint(out, count)
+    return bytes(out)
+
+
+def unpack_frequency_map(data: bytes) -> Dict[str, int]:
+    """Decode pack_frequency_map() output."""
+    data = bytes(data)
+    if not data or max(data) < 0x80:
+        # Every varint is one byte (the usual ASCII map with small counts)
+        numbers = iter(data)
+        return {chr(char): count for char, count in zip(numbers, numbers)}
+    character_frequency_map = {}
+    numbers = []
+    number = shift = 0
+    for byte in data:
+        number |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        numbers.append(number)
+        number = shift = 0
+    for index in range(0, len(numbers), 2):
+        character_frequency_map[chr(numbers[index])] = numbers[index + 1]
+    return character_frequency_map
+
+
+def compact_frequency_map_from_settings(
+    character_frequency_map: Dict[str, int],
+) -> Tuple[Dict[str, int], str, Optional[Dict[str, Any]]]:
+    """compact_frequency_map() with the STRING_FREQUENCY_* settings."""
+    return compact_frequency_map(
+        character_frequency_map,
+        settings.STRING_FREQUENCY_MAP_MODE,
+        settings.STRING_FREQUENCY_MAP_TOP_K,
+        settings.STRING_FREQUENCY_SKETCH_WIDTH,
+        settings.STRING_FREQUENCY_SKETCH_DEPTH,
+    )
+
+
+def frequency_map_properties(character_frequency_map, mode, tail) -> Dict[str, Any]:
+    """The frequency map entries of a properties block.
+
+    Exact maps keep the original single-key shape; reduced maps also say
+    which mode was used and carry the tail summary.
+    """
+    properties = {'character_frequency_map': character_frequency_map}
+    if mode != 'exact':
+        properties['character_frequency_map_mode'] = mode
+        properties['character_frequency_map_tail'] = tail
+    return properties
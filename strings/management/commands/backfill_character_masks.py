@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from strings.models import CharacterOccurrence, StringAnalysis
+from strings.utils import character_class_mask
+
+
+class Command(BaseCommand):
+    help = 'Fill in character_mask for strings stored before it existed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        pending = StringAnalysis.objects.filter(character_mask__isnull=True).order_by('pk')
+        updated = 0
+        while True:
+            # Updated rows drop out of pending, so each pass takes the next batch
+            ids = list(pending.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            # Masks come from the character index, which has the full map
+            # even for rows whose stored map was reduced to its top K
+            characters = {pk: [] for pk in ids}
+            for pk, char in CharacterOccurrence.objects.filter(string_id__in=ids).values_list('string_id', 'character'):
+                characters[pk].append(char)
+            StringAnalysis.objects.bulk_update(
+                [StringAnalysis(pk=pk, character_mask=character_class_mask(chars)) for pk, chars in characters.items()],
+                ['character_mask'],
+            )
+            updated += len(ids)
+            self.stdout.write(f'{updated} strings updated')
+        self.stdout.write(self.style.SUCCESS(f'Backfilled character_mask for {updated} strings'))
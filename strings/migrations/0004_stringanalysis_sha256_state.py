@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strings', '0003_stringanalysis_sha256_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stringanalysis',
+            name='sha256_state',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='stringanalysis',
+            name='is_palindrome',
+            field=models.BooleanField(null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strings', '0004_stringanalysis_sha256_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stringanalysis',
+            name='frequency_map_mode',
+            field=models.CharField(choices=[('exact', 'exact'), ('top_k', 'top_k'), ('sketch', 'sketch')], default='exact', max_length=8),
+        ),
+        migrations.AddField(
+            model_name='stringanalysis',
+            name='frequency_map_tail',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:54
+
+from django.db import migrations, models
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """AddIndex that builds with CREATE INDEX CONCURRENTLY on PostgreSQL, so
+    existing tables stay writable; other databases build it normally."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.add_index(model, self.index, concurrently=True)
+        else:
+            schema_editor.add_index(model, self.index)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.remove_index(model, self.index, concurrently=True)
+        else:
+            schema_editor.remove_index(model, self.index)
+
+
+class Migration(migrations.Migration):
+
+    # CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('strings', '0005_stringanalysis_frequency_map_mode'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='stringanalysis',
+            index=models.Index(fields=['-created_at'], name='string_created_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='stringanalysis',
+            index=models.Index(fields=['length'], name='string_length_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='stringanalysis',
+            index=models.Index(fields=['word_count', 'length'], name='string_word_count_length_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='stringanalysis',
+            index=models.Index(condition=models.Q(('is_palindrome', True)), fields=['length'], name='string_palindrome_length_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='stringanalysis',
+            index=models.Index(condition=models.Q(('is_palindrome', True)), fields=['word_count', 'length'], name='string_palindrome_words_idx'),
+        ),
+    ]
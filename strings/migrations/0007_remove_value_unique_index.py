@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strings', '0006_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='stringanalysis',
+            name='value',
+            field=models.TextField(),
+        ),
+    ]
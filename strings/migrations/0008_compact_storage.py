@@ -0,0 +1,90 @@
+from django.db import migrations, models
+
+
+def _pack_frequency_map(character_frequency_map):
+    # Frozen copy of strings.frequency.pack_frequency_map
+    out = bytearray()
+    for char, count in character_frequency_map.items():
+        for number in (ord(char), count):
+            while number > 0x7f:
+                out.append((number & 0x7f) | 0x80)
+                number >>= 7
+            out.append(number)
+    return bytes(out)
+
+
+def pack_frequency_maps(apps, schema_editor):
+    StringAnalysis = apps.get_model('strings', 'StringAnalysis')
+    batch = []
+    rows = StringAnalysis.objects.only('id', 'character_frequency_map').iterator(chunk_size=1000)
+    for analysis in rows:
+        analysis.character_frequency_data = _pack_frequency_map(analysis.character_frequency_map)
+        batch.append(analysis)
+        if len(batch) == 1000:
+            StringAnalysis.objects.bulk_update(batch, ['character_frequency_data'])
+            batch = []
+    if batch:
+        StringAnalysis.objects.bulk_update(batch, ['character_frequency_data'])
+
+
+def unpack_frequency_maps(apps, schema_editor):
+    StringAnalysis = apps.get_model('strings', 'StringAnalysis')
+    batch = []
+    rows = StringAnalysis.objects.only('id', 'character_frequency_data').iterator(chunk_size=1000)
+    for analysis in rows:
+        numbers = []
+        number = shift = 0
+        for byte in bytes(analysis.character_frequency_data):
+            number |= (byte & 0x7f) << shift
+            if byte & 0x80:
+                shift += 7
+                continue
+            numbers.append(number)
+            number = shift = 0
+        analysis.character_frequency_map = {
+            chr(numbers[index]): numbers[index + 1] for index in range(0, len(numbers), 2)
+        }
+        analysis.sha256_hash = analysis.id
+        batch.append(analysis)
+        if len(batch) == 1000:
+            StringAnalysis.objects.bulk_update(batch, ['character_frequency_map', 'sha256_hash'])
+            batch = []
+    if batch:
+        StringAnalysis.objects.bulk_update(batch, ['character_frequency_map', 'sha256_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strings', '0007_remove_value_unique_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stringanalysis',
+            name='character_frequency_data',
+            field=models.BinaryField(default=b''),
+            preserve_default=False,
+        ),
+        # Reversing needs the old columns back before the data is unpacked,
+        # so they are made nullable rather than dropped in a single step
+        migrations.AlterField(
+            model_name='stringanalysis',
+            name='character_frequency_map',
+            field=models.JSONField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='stringanalysis',
+            name='sha256_hash',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.RunPython(pack_frequency_maps, unpack_frequency_maps),
+        migrations.RemoveField(
+            model_name='stringanalysis',
+            name='character_frequency_map',
+        ),
+        migrations.RemoveField(
+            model_name='stringanalysis',
+            name='sha256_hash',
+        ),
+    ]
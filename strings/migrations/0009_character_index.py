@@ -0,0 +1,86 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:59
+
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _unpack_frequency_map(data):
+    # Frozen copy of strings.frequency.unpack_frequency_map
+    numbers = []
+    number = shift = 0
+    for byte in bytes(data):
+        number |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        numbers.append(number)
+        number = shift = 0
+    return {chr(numbers[index]): numbers[index + 1] for index in range(0, len(numbers), 2)}
+
+
+def _fold_character(char):
+    lowered = char.lower()
+    return lowered if len(lowered) == 1 else char
+
+
+def _fold_counts(counts):
+    folded = {}
+    for char, count in counts.items():
+        char = _fold_character(char)
+        folded[char] = folded.get(char, 0) + count
+    return folded
+
+
+def _stored_counts(StringAnalysis):
+    """(id, character counts) of every row. Rows stored in a reduced
+    frequency map mode are counted from value, since their stored map only
+    has the top characters; new rows are indexed from the full map."""
+    rows = StringAnalysis.objects.filter(frequency_map_mode='exact')
+    for analysis in rows.only('id', 'character_frequency_data').iterator(chunk_size=1000):
+        yield analysis.id, _unpack_frequency_map(analysis.character_frequency_data)
+    rows = StringAnalysis.objects.exclude(frequency_map_mode='exact')
+    for analysis in rows.only('id', 'value').iterator(chunk_size=1000):
+        yield analysis.id, Counter(analysis.value)
+
+
+def index_existing_strings(apps, schema_editor):
+    StringAnalysis = apps.get_model('strings', 'StringAnalysis')
+    CharacterOccurrence = apps.get_model('strings', 'CharacterOccurrence')
+    batch = []
+    for string_id, counts in _stored_counts(StringAnalysis):
+        batch.extend(
+            CharacterOccurrence(string_id=string_id, character=char, count=count)
+            for char, count in _fold_counts(counts).items()
+        )
+        if len(batch) >= 5000:
+            CharacterOccurrence.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        CharacterOccurrence.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strings', '0008_compact_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CharacterOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('character', models.CharField(max_length=1)),
+                ('count', models.IntegerField()),
+                ('string', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='characters', to='strings.stringanalysis')),
+            ],
+            options={
+                'db_table': 'string_character',
+                'indexes': [models.Index(fields=['character', 'count', 'string'], name='string_character_count_idx')],
+                'constraints': [models.UniqueConstraint(fields=('string', 'character'), name='string_character_unique')],
+            },
+        ),
+        migrations.RunPython(index_existing_strings, migrations.RunPython.noop),
+    ]
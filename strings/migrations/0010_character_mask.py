@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strings', '0009_character_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stringanalysis',
+            name='character_mask',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
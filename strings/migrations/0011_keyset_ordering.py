@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:03
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+AddIndexConcurrently = import_module('strings.migrations.0006_filter_indexes').AddIndexConcurrently
+
+
+class RemoveIndexConcurrently(migrations.RemoveIndex):
+    """RemoveIndex that drops with DROP INDEX CONCURRENTLY on PostgreSQL;
+    the reverse of AddIndexConcurrently."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        index = from_state.models[app_label, self.model_name_lower].get_index_by_name(self.name)
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.remove_index(model, index, concurrently=True)
+        else:
+            schema_editor.remove_index(model, index)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        index = to_state.models[app_label, self.model_name_lower].get_index_by_name(self.name)
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.add_index(model, index, concurrently=True)
+        else:
+            schema_editor.add_index(model, index)
+
+
+class Migration(migrations.Migration):
+
+    # CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('strings', '0010_character_mask'),
+    ]
+
+    # The ordering index gains id. The new index is built next to the old
+    # one, so the default ordering is indexed throughout and writes are never
+    # blocked, then takes over its name (a rename, not a rebuild).
+    operations = [
+        migrations.AlterModelOptions(
+            name='stringanalysis',
+            options={'ordering': ['-created_at', '-id']},
+        ),
+        AddIndexConcurrently(
+            model_name='stringanalysis',
+            index=models.Index(fields=['-created_at', '-id'], name='string_created_id_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='stringanalysis',
+            name='string_created_at_idx',
+        ),
+        migrations.RenameIndex(
+            model_name='stringanalysis',
+            new_name='string_created_at_idx',
+            old_name='string_created_id_idx',
+        ),
+    ]
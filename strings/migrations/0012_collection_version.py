@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:06
+
+from django.db import migrations, models
+
+
+def create_version_row(apps, schema_editor):
+    # CollectionVersion.bump() only updates this row, it never creates it
+    CollectionVersion = apps.get_model('strings', 'CollectionVersion')
+    CollectionVersion.objects.create(pk=1, version=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strings', '0011_keyset_ordering'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CollectionVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'string_collection_version',
+            },
+        ),
+        migrations.RunPython(create_version_row, migrations.RunPython.noop),
+    ]
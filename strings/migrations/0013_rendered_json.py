@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strings', '0012_collection_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stringanalysis',
+            name='rendered_json',
+            field=models.BinaryField(null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:40
+
+from django.db import migrations
+
+
+def clear_rendered_json(apps, schema_editor):
+    # rendered_json used to hold the whole row, value included; it now
+    # leaves out id and value. Rows render again on their next read.
+    StringAnalysis = apps.get_model('strings', 'StringAnalysis')
+    StringAnalysis.objects.exclude(rendered_json=None).update(rendered_json=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('strings', '0013_rendered_json'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_rendered_json, migrations.RunPython.noop),
+    ]
@@ -1,21 +1,223 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.db.models.lookups import Exact
+from django.utils.functional import cached_property
 import hashlib
 import json
 
+from .frequency import (
+    FREQUENCY_MAP_MODES,
+    compact_frequency_map_from_settings,
+    fold_character,
+    fold_frequency_map,
+    pack_frequency_map,
+    unpack_frequency_map,
+)
+from .utils import character_class_mask, compute_string_properties
+
+class StringAnalysisQuerySet(models.QuerySet):
+    def containing(self, char, min_count=1):
+        """Strings containing char (case-insensitively) at least min_count
+        times, answered from the character index instead of scanning value.
+
+        ASCII letters and digits are also checked against character_mask,
+        a cheap per-row test that rules rows out before the indexed
+        lookup. Rows whose mask has not been backfilled yet pass it.
+        """
+        char = fold_character(char)
+        occurrences = Exists(CharacterOccurrence.objects.filter(
+            string=OuterRef('pk'),
+            character=char,
+            count__gte=min_count,
+        ))
+        bit = character_class_mask(char)
+        if not bit:
+            return self.filter(occurrences)
+        return self.filter(_mask_allows(bit) & occurrences)
+
+    def containing_all(self, chars):
+        """Strings containing every one of chars."""
+        chars = list(dict.fromkeys(fold_character(char) for char in chars))
+        queryset = self
+        # One mask test covers every ASCII letter and digit at once
+        bits = character_class_mask(chars)
+        if bits:
+            queryset = queryset.filter(_mask_allows(bits))
+        for char in chars:
+            queryset = queryset.filter(
+                Exists(CharacterOccurrence.objects.filter(string=OuterRef('pk'), character=char))
+            )
+        return queryset
+
+
+def _mask_allows(bits):
+    """character_mask & bits == bits, or no mask yet, as a filter() argument."""
+    return Q(Exact(F('character_mask').bitand(bits), bits)) | Q(character_mask__isnull=True)
+
+
 class StringAnalysis(models.Model):
     id = models.CharField(max_length=64, primary_key=True)  # SHA256 hash
-    value = models.TextField(unique=True)
+    # Not unique=True: the id is the hash of the value, so the primary key
+    # already enforces uniqueness without a B-tree over the full text
+    value = models.TextField()
     length = models.IntegerField()
-    is_palindrome = models.BooleanField()
+    # NULL after an append until the full value is next read (see resolve_is_palindrome)
+    is_palindrome = models.BooleanField(null=True)
     unique_characters = models.IntegerField()
     word_count = models.IntegerField()
-    sha256_hash = models.CharField(max_length=64)
-    character_frequency_map = models.JSONField()
+    # character_frequency_map packed by strings.frequency.pack_frequency_map
+    character_frequency_data = models.BinaryField()
+    # How character_frequency_map was reduced for storage, see strings.frequency
+    frequency_map_mode = models.CharField(
+        max_length=8,
+        choices=[(mode, mode) for mode in FREQUENCY_MAP_MODES],
+        default='exact',
+    )
+    frequency_map_tail = models.JSONField(null=True, blank=True)
+    # character_class_mask() of the full frequency map; NULL until backfilled
+    # by the backfill_character_masks command for rows created before it
+    character_mask = models.BigIntegerField(null=True, blank=True)
+    # The row's JSON as StringAnalysisSerializer and JSONRenderer would emit
+    # it, minus id and value (spliced back in when it is served, so the
+    # value is not stored twice); rendered on first read, see
+    # strings.rendered. NULL until then
+    rendered_json = models.BinaryField(null=True, editable=False)
+    # Resumable SHA-256 state (ResumableSHA256.get_state) saved by appends
+    sha256_state = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = StringAnalysisQuerySet.as_manager()
+
     class Meta:
         db_table = 'string_analysis'
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        # One per filter combination used by StringsView.get and
+        # natural_language_filter, plus the default ordering. Palindromes
+        # are a small minority, so they get small partial indexes (which
+        # also match the bare boolean WHERE clause Django emits).
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='string_created_at_idx'),
+            models.Index(fields=['length'], name='string_length_idx'),
+            models.Index(fields=['word_count', 'length'], name='string_word_count_length_idx'),
+            models.Index(
+                fields=['length'],
+                condition=models.Q(is_palindrome=True),
+                name='string_palindrome_length_idx',
+            ),
+            models.Index(
+                fields=['word_count', 'length'],
+                condition=models.Q(is_palindrome=True),
+                name='string_palindrome_words_idx',
+            ),
+        ]
+
+    @staticmethod
+    def id_for_value(value):
+        """Primary key of the row for value: its UTF-8 SHA-256 hex digest."""
+        return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def create_from_properties(cls, value, properties):
+        """Insert a row for value from its compute_string_properties() result."""
+        frequency_map, frequency_map_mode, frequency_map_tail = compact_frequency_map_from_settings(
+            properties['character_frequency_map']
+        )
+        with transaction.atomic():
+            analysis = cls.objects.create(
+                id=properties['sha256_hash'],
+                value=value,
+                length=properties['length'],
+                is_palindrome=properties['is_palindrome'],
+                unique_characters=properties['unique_characters'],
+                word_count=properties['word_count'],
+                character_frequency_data=pack_frequency_map(frequency_map),
+                frequency_map_mode=frequency_map_mode,
+                frequency_map_tail=frequency_map_tail,
+                character_mask=character_class_mask(properties['character_frequency_map']),
+            )
+            # Indexed from the full map, even when the stored map is reduced
+            CharacterOccurrence.objects.bulk_create(
+                CharacterOccurrence(string=analysis, character=char, count=count)
+                for char, count in fold_frequency_map(properties['character_frequency_map']).items()
+            )
+            CollectionVersion.bump()
+        return analysis
+
+    @property
+    def sha256_hash(self):
+        # The id is the digest; it is stored once
+        return self.id
+
+    @cached_property
+    def character_frequency_map(self):
+        """Decoded only when a caller (usually the serializer) needs it."""
+        return unpack_frequency_map(self.character_frequency_data)
+
+    def resolve_is_palindrome(self):
+        """Fill in is_palindrome if an append left it unknown."""
+        if self.is_palindrome is None:
+            self.is_palindrome = StringAnalysis.store_is_palindrome(self.pk, self.value)
+        return self.is_palindrome
+
+    @staticmethod
+    def store_is_palindrome(pk, value=None):
+        """Compute and save is_palindrome for row pk; value is read from the
+        row when not given."""
+        if value is None:
+            value = StringAnalysis.objects.filter(pk=pk).values_list('value', flat=True).get()
+        is_palindrome = compute_string_properties(value, ['is_palindrome'])['is_palindrome']
+        StringAnalysis.objects.filter(pk=pk).update(is_palindrome=is_palindrome)
+        # is_palindrome filters now match this row
+        CollectionVersion.bump()
+        return is_palindrome
+
+    def __str__(self):
+        return f"{self.value} (ID: {self.id})"
+
+
+class CharacterOccurrence(models.Model):
+    """Inverted character index: one row per (string, case-folded character).
+
+    Rows are written with their StringAnalysis and removed with it by the
+    cascade, so contains_character filters are index lookups on
+    (character, count) instead of LIKE scans over every value.
+    """
+    string = models.ForeignKey(StringAnalysis, on_delete=models.CASCADE, related_name='characters')
+    character = models.CharField(max_length=1)
+    count = models.IntegerField()
+
+    class Meta:
+        db_table = 'string_character'
+        constraints = [
+            models.UniqueConstraint(fields=['string', 'character'], name='string_character_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['character', 'count', 'string'], name='string_character_count_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.character!r} x{self.count} in {self.string_id}"
+
+
+class CollectionVersion(models.Model):
+    """Single-row counter bumped by every write to string_analysis.
+
+    Cached filter results are keyed on it, so a write in any worker makes
+    them stale in all of them.
+    """
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'string_collection_version'
+
+    @classmethod
+    def current(cls):
+        return cls.objects.values_list('version', flat=True).get(pk=1)
+
+    @classmethod
+    def bump(cls):
+        # The row is created by migration 0012
+        cls.objects.filter(pk=1).update(version=F('version') + 1)
 
     def __str__(self):
-        return f"{self.value} (ID: {self.id})"
\ No newline at end of file
+        return f"Collection version {self.version}"
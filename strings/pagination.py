@@ -0,0 +1,168 @@
+import base64
+import binascii
+import json
+import re
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Rows are listed newest first; id breaks ties between equal timestamps so
+# every row has a unique position
+ORDERING = ('-created_at', '-id')
+
+# ?count= values:
+#   exact    - COUNT(*) of the matches
+#   estimate - the planner's row estimate on PostgreSQL, elsewhere a COUNT
+#              that stops at STRING_COUNT_ESTIMATE_LIMIT
+#   none     - no count at all (null in the response)
+COUNT_MODES = ('exact', 'estimate', 'none')
+
+_CURSOR_ID = re.compile(r'[0-9a-f]{64}')
+
+
+def get_count_mode(request) -> str:
+    count_mode = request.query_params.get('count', 'exact')
+    if count_mode not in COUNT_MODES:
+        raise ValueError('Invalid count parameter')
+    return count_mode
+
+
+def estimate_count(queryset) -> int:
+    """Approximate number of rows in queryset, without counting them all."""
+    queryset = queryset.order_by()
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    return queryset[:settings.STRING_COUNT_ESTIMATE_LIMIT].count()
+
+
+def count_rows(queryset, count_mode):
+    if count_mode == 'none':
+        return None
+    if count_mode == 'estimate':
+        return estimate_count(queryset)
+    return queryset.count()
+
+
+class StringPagination(LimitOffsetPagination):
+    """?limit=&offset= pages of at most STRING_MAX_PAGE_SIZE rows.
+
+    Unlike LimitOffsetPagination, the page is fetched before anything is
+    counted: a page that reaches the end of the results gives the count
+    for free, and one extra row says whether there is a next page.
+    """
+    max_limit = settings.STRING_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        count_mode = get_count_mode(request)
+
+        page = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(page) > self.limit
+        page = page[:self.limit]
+        if count_mode != 'none' and not self.has_next and (page or not self.offset):
+            self.count = self.offset + len(page)
+        else:
+            self.count = count_rows(queryset, count_mode)
+        return page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.offset_query_param, self.offset + self.limit)
+
+
+def encode_cursor(analysis) -> str:
+    position = f'{analysis.created_at.isoformat()}|{analysis.id}'
+    return base64.urlsafe_b64encode(position.encode('ascii')).decode('ascii')
+
+
+def decode_cursor(cursor: str):
+    """(created_at, id) of an encode_cursor() token; ValueError if invalid."""
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('ascii').split('|')
+        created_at = datetime.fromisoformat(created_at)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError('Invalid cursor parameter')
+    if created_at.tzinfo is None or not _CURSOR_ID.fullmatch(pk):
+        raise ValueError('Invalid cursor parameter')
+    return created_at, pk
+
+
+class KeysetPagination:
+    """Forward-only ?cursor= pages keyed on (created_at, id).
+
+    A page starts with a WHERE on the last row of the previous page rather
+    than an OFFSET, so it is a range read of the ordering index however deep
+    it is. An empty cursor asks for the first page.
+    """
+    cursor_query_param = 'cursor'
+
+    def __init__(self):
+        self.limits = StringPagination()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.limits.get_limit(request)
+        count_mode = get_count_mode(request)
+        cursor = request.query_params.get(self.cursor_query_param)
+        queryset = queryset.order_by(*ORDERING)
+        matches = queryset
+        if cursor:
+            created_at, pk = decode_cursor(cursor)
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+        # One extra row says whether there is a next page
+        page = list(queryset[:self.limit + 1])
+        self.next_cursor = encode_cursor(page[self.limit - 1]) if len(page) > self.limit else None
+        page = page[:self.limit]
+        if count_mode != 'none' and not cursor and self.next_cursor is None:
+            self.count = len(page)
+        else:
+            self.count = count_rows(matches, count_mode)
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.limits.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_previous_link(self):
+        return None
+
+
+def paginate(queryset, request):
+    """Page of queryset for request, and the count/next/previous entries of
+    the response.
+
+    Uses keyset pagination when the request has a cursor parameter (even an
+    empty one) and limit/offset otherwise. The count takes at most one
+    query, per ?count=. ValueError for a bad cursor or count parameter.
+    """
+    if KeysetPagination.cursor_query_param in request.query_params:
+        paginator = KeysetPagination()
+    else:
+        paginator = StringPagination()
+        queryset = queryset.order_by(*ORDERING)
+    page = paginator.paginate_queryset(queryset, request)
+    return page, {
+        'count': paginator.count,
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link(),
+    }
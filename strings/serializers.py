@@ -1,7 +1,55 @@
 from rest_framework import serializers
+from .frequency import frequency_map_properties
 from .models import StringAnalysis
+from .utils import PROPERTY_NAMES
+
+# Names accepted by ?fields=: the top-level keys, "properties" for the whole
+# block, or individual property names for part of it
+FIELD_NAMES = ('id', 'value', 'properties', 'created_at') + PROPERTY_NAMES
+
+# Model columns each field is read from, besides id and created_at which
+# are always loaded (pagination cursors are built from them)
+FIELD_COLUMNS = {
+    'id': (),
+    'value': ('value',),
+    'created_at': (),
+    'length': ('length',),
+    'is_palindrome': ('is_palindrome',),
+    'unique_characters': ('unique_characters',),
+    'word_count': ('word_count',),
+    'sha256_hash': (),
+    'character_frequency_map': ('character_frequency_data', 'frequency_map_mode', 'frequency_map_tail'),
+}
+
+
+def parse_field_names(raw):
+    """Parse a comma-separated ?fields= list, rejecting unknown names.
+
+    "properties" expands to every property name.
+    """
+    names = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = [name for name in names if name not in FIELD_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    if not names:
+        raise ValueError('No fields requested')
+    if 'properties' in names:
+        names = [name for name in names if name != 'properties'] + list(PROPERTY_NAMES)
+    return list(dict.fromkeys(names))
+
+
+def only_fields(queryset, fields):
+    """queryset loading just the columns the fields need (all when None)."""
+    if fields is None:
+        return queryset
+    return queryset.only('id', 'created_at', *(column for name in fields for column in FIELD_COLUMNS[name]))
+
 
 class StringAnalysisSerializer(serializers.ModelSerializer):
+    """Pass fields=parse_field_names(...) to emit only part of each row; the
+    properties block then holds just the requested properties, and is left
+    out when none are requested."""
+
     class Meta:
         model = StringAnalysis
         fields = ['id', 'value', 'properties', 'created_at']
@@ -9,12 +57,24 @@ class StringAnalysisSerializer(serializers.ModelSerializer):
 
     properties = serializers.SerializerMethodField()
 
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.property_names = PROPERTY_NAMES
+        if fields is not None:
+            self.property_names = [name for name in PROPERTY_NAMES if name in fields]
+            keep = set(fields) | ({'properties'} if self.property_names else set())
+            for name in set(self.fields) - keep:
+                self.fields.pop(name)
+
     def get_properties(self, obj):
-        return {
-            'length': obj.length,
-            'is_palindrome': obj.is_palindrome,
-            'unique_characters': obj.unique_characters,
-            'word_count': obj.word_count,
-            'sha256_hash': obj.sha256_hash,
-            'character_frequency_map': obj.character_frequency_map
-        }
\ No newline at end of file
+        properties = {}
+        for name in self.property_names:
+            if name == 'is_palindrome':
+                properties[name] = obj.resolve_is_palindrome()
+            elif name == 'character_frequency_map':
+                properties.update(frequency_map_properties(
+                    obj.character_frequency_map, obj.frequency_map_mode, obj.frequency_map_tail
+                ))
+            else:
+                properties[name] = getattr(obj, name)
+        return properties
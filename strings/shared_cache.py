@@ -0,0 +1,169 @@
+import mmap
+import os
+import struct
+import threading
+from typing import Any, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Slot layout: sequence number, raw SHA-256 key, payload length, payload.
+# The sequence is odd while a writer is inside the slot.
+_HEADER = struct.Struct('<Q32sI')
+_SEQUENCE = struct.Struct('<Q')
+_EMPTY_KEY = bytes(32)
+
+
+def shared_cache_available() -> bool:
+    """Whether this platform has the file locks the shared cache needs."""
+    return fcntl is not None
+
+
+class SharedPayloadCache:
+    """Payloads keyed by SHA-256 hex digest in an mmap'd file that every
+    worker process on the node maps.
+
+    The file is a direct-mapped table of fixed-size slots: a key's slot is
+    fixed by its digest, a newer key evicts an older one in the same slot,
+    and payloads larger than a slot are not stored, so the footprint is
+    exactly slots * slot_size bytes. Because it is a file, entries survive
+    worker restarts.
+
+    path is a prefix: the slot count and size are appended to the file
+    name, so workers with other settings (during a rolling deploy) use a
+    file of their own. A file is never resized once created, because other
+    processes may have it mapped; one of the wrong size disables the cache.
+
+    Reads take no lock. A writer makes the slot's sequence number odd,
+    writes, then makes it even again; a reader that sees an odd or changed
+    sequence treats the slot as a miss (a seqlock). Writers to the same
+    stripe of slots exclude each other with an fcntl byte-range lock (other
+    processes) and a thread lock (this one); the kernel drops fcntl locks
+    of a worker that dies mid-write.
+    """
+
+    def __init__(self, path: str, slots: int, slot_size: int, stripes: int = 64):
+        if slot_size <= _HEADER.size:
+            raise ValueError(f'slot_size must be larger than {_HEADER.size} bytes')
+        self.path = f'{path}.{slots}x{slot_size}'
+        self.slots = slots
+        self.slot_size = slot_size
+        self.capacity = slot_size - _HEADER.size
+        self.stripes = stripes
+        self._thread_locks = [threading.Lock() for _ in range(stripes)]
+        self._open_lock = threading.Lock()
+        self._fd = None
+        self._map = None
+        self.disabled = False
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _mapping(self) -> Optional[mmap.mmap]:
+        """The mapped file, or None if the cache is disabled."""
+        if self._map is None and not self.disabled:
+            with self._open_lock:
+                if self._map is None and not self.disabled:
+                    self._open()
+        return self._map
+
+    def _open(self) -> None:
+        size = self.slots * self.slot_size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        # Whole-file lock so only one worker sizes (and zeroes) a new file.
+        # An empty file cannot be mapped yet, so sizing it is safe; any other
+        # size means a file that is not ours to change
+        fcntl.lockf(fd, fcntl.LOCK_EX)
+        try:
+            current = os.fstat(fd).st_size
+            if current == 0:
+                os.ftruncate(fd, size)
+        finally:
+            fcntl.lockf(fd, fcntl.LOCK_UN)
+        if current not in (0, size):
+            os.close(fd)
+            self.disabled = True
+            return
+        self._fd = fd
+        self._map = mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+
+    def _slot(self, key: bytes) -> int:
+        return int.from_bytes(key[:8], 'little') % self.slots
+
+    def _count(self, hit: bool) -> None:
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, sha256_hash: str) -> Optional[bytes]:
+        key = bytes.fromhex(sha256_hash)
+        mapping = self._mapping()
+        if mapping is None:
+            self._count(False)
+            return None
+        offset = self._slot(key) * self.slot_size
+        sequence, stored_key, length = _HEADER.unpack_from(mapping, offset)
+        payload = None
+        if not sequence & 1 and stored_key == key and length <= self.capacity:
+            start = offset + _HEADER.size
+            payload = mapping[start:start + length]
+            if _SEQUENCE.unpack_from(mapping, offset)[0] != sequence:
+                payload = None
+        self._count(payload is not None)
+        return payload
+
+    def _write(self, key: bytes, payload: bytes, only_if_key: Optional[bytes] = None) -> None:
+        mapping = self._mapping()
+        if mapping is None:
+            return
+        slot = self._slot(key)
+        offset = slot * self.slot_size
+        stripe = slot % self.stripes
+        with self._thread_locks[stripe]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, stripe)
+            try:
+                sequence, stored_key, _ = _HEADER.unpack_from(mapping, offset)
+                if only_if_key is not None and stored_key != only_if_key:
+                    return
+                # Odd sequence first, so readers ignore the half-written slot
+                sequence |= 1
+                _SEQUENCE.pack_into(mapping, offset, sequence)
+                start = offset + _HEADER.size
+                mapping[start:start + len(payload)] = payload
+                _HEADER.pack_into(mapping, offset, sequence, key if only_if_key is None else _EMPTY_KEY, len(payload))
+                _SEQUENCE.pack_into(mapping, offset, sequence + 1)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, stripe)
+
+    def put(self, sha256_hash: str, payload: bytes) -> None:
+        if len(payload) > self.capacity:
+            return
+        self._write(bytes.fromhex(sha256_hash), payload)
+
+    def delete(self, sha256_hash: str) -> None:
+        """Empty the key's slot if it still holds that key."""
+        key = bytes.fromhex(sha256_hash)
+        self._write(key, b'', only_if_key=key)
+
+    def stats(self) -> Dict[str, Any]:
+        mapping = self._mapping()
+        entries = 0 if mapping is None else sum(
+            _HEADER.unpack_from(mapping, slot * self.slot_size)[1] != _EMPTY_KEY
+            for slot in range(self.slots)
+        )
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': entries,
+                'slots': self.slots,
+                'slot_size': self.slot_size,
+                'bytes': self.slots * self.slot_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'disabled': self.disabled,
+            }
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from .fast_serializer import dumps, row_renderer
+from .pagination import ORDERING
+
+
+def _stream_rows(rows, fields, extra):
+    chunk_size = settings.STRING_EXPORT_CHUNK_SIZE
+    render = row_renderer(fields)
+    buffer = [b'{"data":[']
+    count = 0
+    for row in rows.order_by(*ORDERING).iterator(chunk_size=chunk_size):
+        if count:
+            buffer.append(b',')
+        buffer.append(render(row))
+        count += 1
+        # One write per fetched chunk rather than per row
+        if count % chunk_size == 0:
+            yield b''.join(buffer)
+            buffer = []
+    # Counted while streaming, so it comes after the rows and costs no query
+    buffer.append(b'],"count":%d' % count)
+    buffer.append(b',' + dumps(extra)[1:] if extra else b'}')
+    yield b''.join(buffer)
+
+
+def streaming_response(rows, fields=None, **extra):
+    """Every row of rows, a values_list(*row_columns(fields), named=True)
+    queryset, as {"data": [...], "count": n, **extra}, sent as it is read
+    from the database instead of being built in memory.
+
+    Rows are fetched in chunks of STRING_EXPORT_CHUNK_SIZE, so memory use
+    does not grow with the number of rows.
+    """
+    return StreamingHttpResponse(_stream_rows(rows, fields, extra), content_type='application/json')
@@ -0,0 +1,89 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from django.conf import settings
+from django.db import IntegrityError, connections
+
+from .cache import compute_string_properties_cached
+from .models import StringAnalysis
+from .sha256 import sha256_state
+
+logger = logging.getLogger(__name__)
+
+# Rows whose response only needed some properties are stored from here,
+# after the response has been sent.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.STRING_BACKGROUND_WORKERS,
+    thread_name_prefix='string-analysis',
+)
+
+# SHA-256 states for appends are computed one at a time on their own
+# thread, which hands the hashing to a worker process so the pure-Python
+# rounds do not hold this process's GIL. Spawned rather than forked, as
+# the web process has threads of its own.
+_state_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='string-sha256-state')
+_state_pool = None
+_state_pool_lock = threading.Lock()
+
+
+# Ids with a queued or running _store_sha256_state()
+_pending_states = set()
+_pending_states_lock = threading.Lock()
+
+
+def _store_analysis(value: str) -> None:
+    try:
+        analysis = StringAnalysis.create_from_properties(value, compute_string_properties_cached(value))
+    except IntegrityError:
+        # The same value was stored by another request in the meantime
+        return
+    except Exception:
+        # The client already has its 202, so this log line is all that is left
+        logger.exception('Storing an analysis in the background failed')
+        return
+    finally:
+        connections.close_all()
+
+
+def _get_state_pool() -> ProcessPoolExecutor:
+    global _state_pool
+    with _state_pool_lock:
+        if _state_pool is None:
+            _state_pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        return _state_pool
+
+
+def _store_sha256_state(analysis_id: str) -> None:
+    try:
+        # Rows that were appended to in the meantime have moved to a new id
+        # and saved their own state
+        pending = StringAnalysis.objects.filter(pk=analysis_id, sha256_state__isnull=True)
+        value = pending.values_list('value', flat=True).first()
+        if value is not None:
+            state = _get_state_pool().submit(sha256_state, value.encode('utf-8')).result()
+            pending.update(sha256_state=state)
+    except Exception:
+        logger.exception('Saving the SHA-256 state of %s failed', analysis_id)
+    finally:
+        with _pending_states_lock:
+            _pending_states.discard(analysis_id)
+        connections.close_all()
+
+
+def store_analysis_in_background(value: str) -> Future:
+    """Compute the full property set for value and insert its row off-request."""
+    return _executor.submit(_store_analysis, value)
+
+
+def store_sha256_state_in_background(analysis_id: str) -> Optional[Future]:
+    """Save the resumable SHA-256 state of a row's value off-request, for an
+    append that found the value too long to hash inline. None if it is
+    already queued."""
+    with _pending_states_lock:
+        if analysis_id in _pending_states:
+            return None
+        _pending_states.add(analysis_id)
+    return _state_executor.submit(_store_sha256_state, analysis_id)
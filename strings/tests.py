@@ -0,0 +1,939 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+import time
+import unittest
+import unittest.mock
+from collections import Counter
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from . import cache, fast_serializer, utils, views
+from .cache import PayloadCache, PropertiesCache, detail_cache, estimate_properties_size
+from .frequency import compact_frequency_map, pack_frequency_map, unpack_frequency_map
+from .models import StringAnalysis
+from .rendered import RENDERED_COLUMNS, rendered_payloads
+from .serializers import StringAnalysisSerializer, only_fields, parse_field_names
+from .sha256 import ResumableSHA256
+from .shared_cache import SharedPayloadCache, shared_cache_available
+from .tasks import _store_analysis, _store_sha256_state
+from .utils import (
+    PROPERTY_NAMES,
+    StreamingStringAnalyzer,
+    append_string_properties,
+    compute_string_properties,
+    compute_string_properties_batch,
+    compute_string_properties_parallel,
+    shutdown_batch_pool,
+)
+from .vectorized import compute_string_properties_vectorized, numpy_available
+
+
+def legacy_compute_string_properties(value):
+    """The multi-pass analyzer this service shipped with."""
+    cleaned_value = re.sub(r'[^a-zA-Z0-9]', '', value.lower())
+    return {
+        'length': len(value),
+        'is_palindrome': cleaned_value == cleaned_value[::-1] if cleaned_value else False,
+        'unique_characters': len(set(value)),
+        'word_count': len(value.split()),
+        'sha256_hash': hashlib.sha256(value.encode('utf-8')).hexdigest(),
+        'character_frequency_map': dict(Counter(value))
+    }
+
+
+class AnalyzerTests(SimpleTestCase):
+    """The fused analyzer, and the streaming and append paths built on its
+    helpers, give exactly what the legacy analyzer gave."""
+
+    values = [
+        '', ' ', ' \t\n ', 'racecar', 'A man, a plan, a canal: Panama', 'naïve café',
+        # Whitespace to str.split() but not to a byte-level ASCII check
+        'a\x1cb\x1dc\x1ed\x1fe', 'word\x85word', 'full\u3000width', '\u3000\x85',
+        # Non-ASCII characters whose lower() is ASCII
+        '\u0130i', 'K\u212a k', '\u212a',
+    ]
+
+    def test_matches_legacy(self):
+        for value in self.values:
+            with self.subTest(value=value):
+                expected = legacy_compute_string_properties(value)
+                self.assertEqual(compute_string_properties(value), expected)
+                self.assertEqual(compute_string_properties(value, PROPERTY_NAMES), expected)
+
+    def test_streaming_matches_legacy(self):
+        for value in self.values:
+            with self.subTest(value=value), StreamingStringAnalyzer() as analyzer:
+                for start in range(0, len(value), 3):
+                    analyzer.update(value[start:start + 3])
+                self.assertEqual(analyzer.result(), legacy_compute_string_properties(value))
+
+    def test_append_matches_legacy(self):
+        for value in self.values:
+            for fragment in self.values:
+                with self.subTest(value=value, fragment=fragment):
+                    expected = legacy_compute_string_properties(value + fragment)
+                    appended = append_string_properties(
+                        compute_string_properties(value),
+                        fragment,
+                        bool(value) and not value[-1].isspace(),
+                        expected['sha256_hash'],
+                    )
+                    self.assertEqual(appended, {**expected, 'is_palindrome': None})
+
+    @unittest.skipUnless(numpy_available(), 'needs numpy')
+    def test_vectorized_matches_serial(self):
+        values = self.values + ['😀 emoji 😀', 'e\u0301 combining', '\U0010ffff', 'ß ẞ', 'tab\tnew\nline\r\x0b\x0c']
+        expected = [compute_string_properties(value) for value in values]
+        self.assertEqual(compute_string_properties_vectorized(values), expected)
+        self.assertEqual(compute_string_properties_vectorized([]), [])
+        self.assertEqual(
+            compute_string_properties_batch(values, 'vectorized', properties=['length', 'word_count']),
+            [{'length': result['length'], 'word_count': result['word_count']} for result in expected],
+        )
+
+    def test_parallel_matches_serial(self):
+        self.addCleanup(shutdown_batch_pool)
+        # Chunk boundaries land inside words, on whitespace and next to
+        # multi-byte characters as the length varies
+        text = 'ab cd\u3000éf  g\x85hi jklm 😀n '
+        values = [text * repeat + text[:extra] for repeat in (1, 3) for extra in range(len(text))]
+        values += ['   leading', 'trailing   ', 'x', 'K\u212a\u0130']
+        for value in values:
+            with self.subTest(value=value):
+                self.assertEqual(compute_string_properties_parallel(value, processes=3), compute_string_properties(value))
+
+    def test_parallel_above_threshold(self):
+        self.addCleanup(shutdown_batch_pool)
+        value = 'step on no pets ' * 100
+        with unittest.mock.patch.object(utils, 'PARALLEL_ANALYSIS_THRESHOLD', 100), \
+                unittest.mock.patch.object(utils.os, 'cpu_count', return_value=2), \
+                unittest.mock.patch.object(utils, '_analyze_parallel', wraps=utils._analyze_parallel) as parallel:
+            self.assertEqual(compute_string_properties(value), legacy_compute_string_properties(value))
+        parallel.assert_called_once()
+
+    def test_process_batch_matches_serial(self):
+        self.addCleanup(shutdown_batch_pool)
+        expected = [compute_string_properties(value) for value in self.values]
+        self.assertEqual(compute_string_properties_batch(self.values, 'process', processes=2), expected)
+        # Another size replaces the pool rather than adding one
+        self.assertEqual(compute_string_properties_batch(self.values, 'process', processes=1), expected)
+        self.assertEqual(list(utils._batch_pool_users), [utils._batch_pool])
+
+
+class ResumableSHA256Tests(SimpleTestCase):
+    """Digests and saved states agree with hashlib around the block and
+    padding boundaries."""
+
+    lengths = [0, 1, 55, 56, 63, 64, 65, 119, 120, 128, 1000]
+
+    def data(self, length):
+        return bytes(range(256)) * (length // 256) + bytes(range(length % 256))
+
+    def test_hexdigest(self):
+        for length in self.lengths:
+            with self.subTest(length=length):
+                data = self.data(length)
+                self.assertEqual(ResumableSHA256(data).hexdigest(), hashlib.sha256(data).hexdigest())
+
+    def test_state_round_trip(self):
+        for length in self.lengths:
+            for split in sorted({0, length // 2, length}):
+                with self.subTest(length=length, split=split):
+                    data = self.data(length)
+                    digest = ResumableSHA256(data[:split])
+                    resumed = ResumableSHA256.from_state(digest.get_state())
+                    self.assertEqual(resumed.get_state(), digest.get_state())
+                    resumed.update(data[split:])
+                    self.assertEqual(resumed.hexdigest(), hashlib.sha256(data).hexdigest())
+
+    def test_multiple_updates(self):
+        data = self.data(1000)
+        digest = ResumableSHA256()
+        expected = hashlib.sha256()
+        for start, end in [(0, 0), (0, 55), (55, 56), (56, 63), (63, 64), (64, 129), (129, 1000)]:
+            digest = ResumableSHA256.from_state(digest.get_state())
+            digest.update(data[start:end])
+            expected.update(data[start:end])
+            self.assertEqual(digest.hexdigest(), expected.hexdigest())
+
+
+@override_settings(STRING_APPEND_INLINE_HASH_BYTES=8)
+class AppendTests(TestCase):
+    """Appends resume the SHA-256 state saved by the first append and never
+    hash a long stored value during the request."""
+
+    def append(self, value, fragment):
+        return self.client.patch(f'/strings/{value}/append', {'value': fragment}, content_type='application/json')
+
+    def test_resumes_saved_state(self):
+        self.assertEqual(self.client.post('/strings', {'value': 'hello world'}).status_code, 201)
+        _store_sha256_state(StringAnalysis.id_for_value('hello world'))
+        response = self.append('hello world', ' again')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], StringAnalysis.id_for_value('hello world again'))
+        self.assertEqual(
+            response.json()['properties'],
+            {**legacy_compute_string_properties('hello world again'), 'is_palindrome': None},
+        )
+        # The saved state moves with the row, so the next append resumes too
+        response = self.append('hello world again', '!')
+        self.assertEqual(response.json()['id'], StringAnalysis.id_for_value('hello world again!'))
+
+    def test_long_value_without_state(self):
+        self.client.post('/strings', {'value': 'hello world'})
+        with unittest.mock.patch('strings.views.store_sha256_state_in_background') as queue:
+            response = self.append('hello world', '!')
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+        queue.assert_called_once_with(StringAnalysis.id_for_value('hello world'))
+        self.assertTrue(StringAnalysis.objects.filter(value='hello world').exists())
+
+    def test_short_value_without_state(self):
+        self.client.post('/strings', {'value': 'racecar'})
+        # Nothing is hashed for appends at insert
+        self.assertIsNone(StringAnalysis.objects.get(value='racecar').sha256_state)
+        response = self.append('racecar', 's')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], StringAnalysis.id_for_value('racecars'))
+        self.assertIsNotNone(StringAnalysis.objects.get(value='racecars').sha256_state)
+
+    def append_racing(self, value, fragment, concurrent_change):
+        """Append, with concurrent_change() run after the row was read."""
+        compute = utils.append_string_properties
+        pending = [concurrent_change]
+
+        def racing(*args, **kwargs):
+            if pending:
+                pending.pop()()
+            return compute(*args, **kwargs)
+
+        with unittest.mock.patch('strings.views.append_string_properties', side_effect=racing):
+            return self.append(value, fragment)
+
+    def test_row_deleted_during_append(self):
+        self.client.post('/strings', {'value': 'racecar'})
+        response = self.append_racing(
+            'racecar', 's', lambda: StringAnalysis.objects.filter(value='racecar').delete()
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(StringAnalysis.objects.exists())
+
+    def test_other_append_wins(self):
+        self.client.post('/strings', {'value': 'racecar'})
+        response = self.append_racing('racecar', 's', lambda: self.append('racecar', 'S'))
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('another append', response.json()['error'])
+        self.assertEqual(list(StringAnalysis.objects.values_list('value', flat=True)), ['racecarS'])
+
+
+class BackgroundTaskTests(SimpleTestCase):
+    """Failures after the response has been sent are logged."""
+
+    def test_store_failure_is_logged(self):
+        with unittest.mock.patch.object(StringAnalysis, 'create_from_properties', side_effect=ValueError('bad')):
+            with self.assertLogs('strings.tasks', 'ERROR') as logs:
+                _store_analysis('some value')
+        self.assertIn('ValueError: bad', logs.output[0])
+
+
+class FrequencyMapTests(SimpleTestCase):
+    """compact_frequency_map() splits maps into an exact head and a tail
+    summary, and the head survives packing."""
+
+    def test_small_maps_stay_exact(self):
+        counts = {'a': 3, 'b': 1, 'é': 2}
+        for mode in ('exact', 'top_k', 'sketch'):
+            with self.subTest(mode=mode):
+                self.assertEqual(compact_frequency_map(counts, mode, top_k=3), (counts, 'exact', None))
+
+    def test_head_and_tail(self):
+        counts = dict(Counter('mississippi river'))
+        head, mode, tail = compact_frequency_map(counts, 'top_k', top_k=2)
+        self.assertEqual((head, mode), ({'i': 5, 's': 4}, 'top_k'))
+        self.assertEqual(tail, {'other': sum(counts.values()) - 9, 'other_unique': len(counts) - 2})
+        self.assertEqual(unpack_frequency_map(pack_frequency_map(head)), head)
+
+    def test_ties_keep_first_occurrence_order(self):
+        counts = {'z': 1, 'b': 2, 'y': 2, 'a': 2, 'c': 1}
+        head, _, _ = compact_frequency_map(counts, 'top_k', top_k=2)
+        self.assertEqual(list(head), ['b', 'y'])
+
+    def test_sketch_rows_hold_the_tail(self):
+        counts = {chr(0x4e00 + i): i + 1 for i in range(40)}
+        head, mode, tail = compact_frequency_map(counts, 'sketch', top_k=4, sketch_width=8, sketch_depth=3)
+        self.assertEqual((len(head), mode, tail['other_unique']), (4, 'sketch', 36))
+        sketch = tail['sketch']
+        for row in sketch['table']:
+            self.assertEqual(sum(row), tail['other'])
+
+    def test_sketch_estimates_from_its_published_hashes(self):
+        counts = {chr(0x4e00 + i): i + 1 for i in range(40)}
+        _, _, tail = compact_frequency_map(counts, 'sketch', top_k=4, sketch_width=8, sketch_depth=3)
+        sketch = json.loads(json.dumps(tail['sketch']))
+        self.assertEqual(len(sketch['hashes']), sketch['depth'])
+        for char, count in list(counts.items())[:36]:
+            estimate = min(
+                sketch['table'][row][((a * ord(char) + b) % sketch['prime']) % sketch['width']]
+                for row, (a, b) in enumerate(sketch['hashes'])
+            )
+            self.assertGreaterEqual(estimate, count)
+
+
+class StreamingUploadTests(APITestCase):
+    """Raw text/plain and octet-stream bodies are stored like JSON values,
+    without the value echoed back."""
+
+    def post(self, body, content_type='text/plain'):
+        return self.client.generic('POST', '/strings', body, content_type=content_type)
+
+    def test_created(self):
+        response = self.post('  naïve café \u3000words\n'.encode('utf-8'))
+        self.assertEqual(response.status_code, 201)
+        value = 'naïve café \u3000words'
+        expected = legacy_compute_string_properties(value)
+        self.assertNotIn('value', response.data)
+        self.assertEqual(response.data['id'], expected['sha256_hash'])
+        self.assertEqual(response.data['properties'], expected)
+        self.assertEqual(response['Location'], f"http://testserver/strings/id/{expected['sha256_hash']}")
+        self.assertEqual(StringAnalysis.objects.get(pk=expected['sha256_hash']).value, value)
+
+    def test_octet_stream_larger_than_a_chunk(self):
+        value = 'ab ' * 50_000 + 'é'
+        with self.settings(STRING_STREAM_CHUNK_SIZE=1000, STRING_STREAM_SPOOL_MAX_SIZE=4096):
+            response = self.post(value.encode('utf-8'), 'application/octet-stream')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['properties'], legacy_compute_string_properties(value))
+
+    def test_duplicate(self):
+        self.assertEqual(self.post(b'hello').status_code, 201)
+        self.assertEqual(self.post(b'hello\n').status_code, 409)
+
+    def test_rejected_bodies(self):
+        self.assertEqual(self.post(b'  \n ').status_code, 400)
+        self.assertEqual(self.post(b'caf\xe9').status_code, 400)
+        self.assertFalse(StringAnalysis.objects.exists())
+
+
+class PartialPropertiesTests(APITestCase):
+    """POST /strings?properties= answers 202 with just those properties and
+    stores the complete row in the background."""
+
+    def setUp(self):
+        cache.properties_cache.clear()
+        detail_cache.clear()
+
+    def post(self, value, properties):
+        # Runs the background store in the request, once it is queued
+        with unittest.mock.patch('strings.views.store_analysis_in_background', side_effect=_store_analysis) as queue:
+            response = self.client.post(f'/strings?properties={properties}', {'value': value}, format='json')
+        return response, queue
+
+    def test_accepted_then_stored(self):
+        response, queue = self.post('  level up  ', 'length,sha256_hash')
+        self.assertEqual(response.status_code, 202)
+        expected = legacy_compute_string_properties('level up')
+        self.assertEqual(response.data, {
+            'id': expected['sha256_hash'],
+            'value': 'level up',
+            'properties': {'length': 8, 'sha256_hash': expected['sha256_hash']},
+        })
+        queue.assert_called_once_with('level up')
+        stored = self.client.get(f"/strings/id/{expected['sha256_hash']}")
+        self.assertEqual(stored.status_code, 200)
+        self.assertEqual(stored.json()['properties'], expected)
+
+    def test_unknown_property(self):
+        response, queue = self.post('level up', 'length,colour')
+        self.assertEqual(response.status_code, 400)
+        queue.assert_not_called()
+        self.assertFalse(StringAnalysis.objects.exists())
+
+    def test_duplicate(self):
+        self.post('level up', 'length')
+        response, queue = self.post('level up', 'length')
+        self.assertEqual(response.status_code, 409)
+        queue.assert_not_called()
+
+
+class AnalyzeTests(APITestCase):
+    """POST /analyze answers from the value alone, without a database query."""
+
+    def analyze(self, data, query=''):
+        with self.assertNumQueries(0):
+            return self.client.post(f'/analyze{query}', data, format='json')
+
+    def test_single(self):
+        response = self.analyze({'value': ' A man a plan '})
+        self.assertEqual(response.status_code, 200)
+        expected = legacy_compute_string_properties('A man a plan')
+        self.assertEqual(response.data, {'id': expected['sha256_hash'], 'value': 'A man a plan', 'properties': expected})
+        self.assertFalse(StringAnalysis.objects.exists())
+
+    def test_batch(self):
+        values = ['racecar', 'hello world', 'naïve café']
+        response = self.analyze({'values': values}, '?properties=length,is_palindrome')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(response.data['data'], [
+            {
+                'value': value,
+                'properties': {
+                    'length': legacy_compute_string_properties(value)['length'],
+                    'is_palindrome': legacy_compute_string_properties(value)['is_palindrome'],
+                },
+            }
+            for value in values
+        ])
+
+    def test_rejected(self):
+        self.assertEqual(self.analyze({'values': ['ok', 3]}).status_code, 422)
+        self.assertEqual(self.analyze({'values': ['ok', '  ']}).status_code, 400)
+        self.assertEqual(self.analyze({'value': 'ok'}, '?properties=colour').status_code, 400)
+        with self.settings(STRING_ANALYZE_MAX_BATCH=2):
+            self.assertEqual(self.analyze({'values': ['a', 'b', 'c']}).status_code, 400)
+
+
+class PaginationTests(TestCase):
+    """Pages count their rows at most once, and not at all when the page
+    reaches the end of the results."""
+
+    values = ['one', 'two', 'three', 'four', 'five']
+
+    @classmethod
+    def setUpTestData(cls):
+        for value in cls.values:
+            StringAnalysis.create_from_properties(value, compute_string_properties(value))
+
+    def setUp(self):
+        # Versions restart with each test's data, so results cached by
+        # another test could match
+        caches['default'].clear()
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        counted = any('COUNT(' in query['sql'] for query in queries.captured_queries)
+        return response.json(), counted
+
+    def test_last_page_with_offset(self):
+        data, counted = self.get('/strings?limit=2&offset=4')
+        self.assertEqual((len(data['data']), data['count'], data['next']), (1, 5, None))
+        self.assertFalse(counted)
+
+    def test_offset_past_the_end(self):
+        data, counted = self.get('/strings?limit=2&offset=10')
+        self.assertEqual((data['data'], data['count'], data['next']), ([], 5, None))
+        self.assertTrue(counted)
+
+    def test_page_with_next_is_counted(self):
+        data, counted = self.get('/strings?limit=2')
+        self.assertEqual((len(data['data']), data['count']), (2, 5))
+        self.assertTrue(counted)
+
+    def test_keyset_first_page_without_next(self):
+        data, counted = self.get('/strings?cursor=&limit=10')
+        self.assertEqual((len(data['data']), data['count'], data['next']), (5, 5, None))
+        self.assertFalse(counted)
+
+    def test_keyset_pages(self):
+        url, seen = '/strings?cursor=&limit=2', []
+        while url:
+            data, _ = self.get(url)
+            self.assertEqual(data['count'], 5)
+            seen += [row['value'] for row in data['data']]
+            url = data['next']
+        self.assertEqual(seen, self.values[::-1])
+
+    def test_count_none(self):
+        url, seen = '/strings?limit=2&count=none', []
+        while url:
+            data, counted = self.get(url)
+            self.assertIsNone(data['count'])
+            self.assertFalse(counted)
+            seen += [row['value'] for row in data['data']]
+            url = data['next']
+        self.assertEqual(seen, self.values[::-1])
+
+    def test_count_estimate(self):
+        data, _ = self.get('/strings?limit=2&count=estimate')
+        self.assertEqual(data['count'], 5)
+
+    def test_invalid_count(self):
+        self.assertEqual(self.client.get('/strings?count=maybe').status_code, 400)
+
+
+class StreamingListTests(APITestCase):
+    """?stream=true sends every match with the rows first and the count,
+    taken while streaming, after them."""
+
+    values = ['one', 'two', 'three', 'four', 'five']
+
+    @classmethod
+    def setUpTestData(cls):
+        for value in cls.values:
+            StringAnalysis.create_from_properties(value, compute_string_properties(value))
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def stream(self, url):
+        with self.settings(STRING_EXPORT_CHUNK_SIZE=2):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_body_matches_the_paged_list(self):
+        body = self.stream('/strings?stream=true&min_length=4')
+        data = json.loads(body)
+        self.assertEqual(list(data), ['data', 'count', 'filters_applied'])
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(data['filters_applied'], {'min_length': 4})
+        self.assertTrue(body.endswith(b'],"count":3,"filters_applied":{"min_length":4}}'))
+        paged = self.client.get('/strings?min_length=4').json()
+        self.assertEqual(data['data'], paged['data'])
+
+    def test_fields_and_no_matches(self):
+        data = json.loads(self.stream('/strings?stream=true&fields=value,length'))
+        self.assertEqual(data['count'], len(self.values))
+        self.assertEqual(
+            sorted(data['data'], key=lambda row: row['value']),
+            sorted(({'value': value, 'properties': {'length': len(value)}} for value in self.values), key=lambda row: row['value']),
+        )
+        self.assertEqual(self.stream('/strings?stream=true&min_length=50'), b'{"data":[],"count":0,"filters_applied":{"min_length":50}}')
+
+    def test_natural_language(self):
+        data = json.loads(self.stream('/strings/filter-by-natural-language?query=strings%20longer%20than%203%20characters&stream=true'))
+        self.assertEqual(list(data), ['data', 'count', 'interpreted_query'])
+        self.assertEqual(data['count'], len(data['data']))
+        self.assertEqual(sorted(row['value'] for row in data['data']), ['five', 'four', 'three'])
+
+
+class ConditionalRequestTests(TestCase):
+    """If-None-Match answers 304 only while the response would really be
+    unchanged, whichever cache the response came from."""
+
+    def setUp(self):
+        caches['default'].clear()
+        detail_cache.clear()
+        self.client.post('/strings', {'value': 'hello world'})
+        self.id = StringAnalysis.id_for_value('hello world')
+
+    def detail(self, **headers):
+        return self.client.get(f'/strings/id/{self.id}', headers=headers)
+
+    def test_detail_not_modified(self):
+        etag = self.detail()['ETag']
+        self.assertTrue(etag.startswith(f'"{self.id}-'))
+        self.assertEqual(detail_cache.get(self.id)[0], etag)
+        self.assertEqual(self.detail(if_none_match=etag).status_code, 304)
+        self.assertEqual(self.client.get('/strings/hello world', headers={'if_none_match': etag}).status_code, 304)
+
+    def test_recreated_string_gets_a_new_etag(self):
+        etag = self.detail()['ETag']
+        created_at = self.detail().json()['created_at']
+        # Deleted and stored again, with this worker's cached body left over
+        StringAnalysis.objects.filter(pk=self.id).delete()
+        StringAnalysis.create_from_properties('hello world', compute_string_properties('hello world'))
+        response = self.detail(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertNotEqual(response.json()['created_at'], created_at)
+        self.assertEqual(self.detail(if_none_match=response['ETag']).status_code, 304)
+
+    def test_deleted_detail_is_not_found(self):
+        etag = self.detail()['ETag']
+        self.assertEqual(self.client.delete(f'/strings/id/{self.id}').status_code, 204)
+        self.assertEqual(self.detail(if_none_match=etag).status_code, 404)
+
+    def test_deleted_by_another_worker(self):
+        # That worker's delete cannot clear this worker's cached body
+        etag = self.detail()['ETag']
+        StringAnalysis.objects.filter(pk=self.id).delete()
+        self.assertIsNotNone(detail_cache.get(self.id))
+        self.assertEqual(self.detail(if_none_match=etag).status_code, 404)
+        self.assertEqual(self.detail().status_code, 404)
+
+    def test_deleted_by_another_worker_unconditional(self):
+        self.assertEqual(self.detail().status_code, 200)
+        StringAnalysis.objects.filter(pk=self.id).delete()
+        # Served from this worker's LRU only until its entry expires
+        self.assertEqual(self.detail().status_code, 200)
+        expired = time.monotonic() + settings.STRING_DETAIL_PAYLOAD_CACHE_MAX_AGE + 1
+        with unittest.mock.patch('strings.cache.time.monotonic', return_value=expired):
+            self.assertEqual(self.detail().status_code, 404)
+
+    def test_deleted_while_rendering(self):
+        def delete_first(rows):
+            StringAnalysis.objects.filter(pk=self.id).delete()
+            return rendered_payloads(rows)
+
+        StringAnalysis.objects.filter(pk=self.id).update(rendered_json=None)
+        with unittest.mock.patch.object(views, 'rendered_payloads', side_effect=delete_first):
+            self.assertEqual(self.detail().status_code, 404)
+
+    def list_etag(self, etag=None):
+        response = self.client.get('/strings', headers={'if_none_match': etag} if etag else {})
+        if response.status_code == 200:
+            values = [row['value'] for row in response.json()['data']]
+        else:
+            values = None
+        return response.status_code, response['ETag'], values
+
+    def assertListChanges(self, write, values):
+        status_code, etag, _ = self.list_etag()
+        self.assertEqual(self.list_etag(etag)[:2], (304, etag))
+        write()
+        status_code, new_etag, new_values = self.list_etag(etag)
+        self.assertEqual(status_code, 200)
+        self.assertNotEqual(new_etag, etag)
+        # Not the page cached before the write
+        self.assertEqual(new_values, values)
+
+    def test_list_etag_changes_after_post(self):
+        self.assertListChanges(lambda: self.client.post('/strings', {'value': 'racecar'}), ['racecar', 'hello world'])
+
+    def test_list_etag_changes_after_delete(self):
+        self.assertListChanges(lambda: self.client.delete(f'/strings/id/{self.id}'), [])
+
+    def test_list_etag_changes_after_patch(self):
+        self.assertListChanges(
+            lambda: self.client.patch('/strings/hello world/append', {'value': '!'}, content_type='application/json'),
+            ['hello world!'],
+        )
+
+
+class PropertiesCacheTests(SimpleTestCase):
+    """The properties LRU stays within its byte budget, evicting the least
+    recently used entry first."""
+
+    def setUp(self):
+        self.properties = {value: compute_string_properties(value) for value in ('alpha', 'beta', 'gamma')}
+        self.sizes = {value: estimate_properties_size(entry) for value, entry in self.properties.items()}
+        # One byte short of all three
+        self.cache = PropertiesCache(sum(self.sizes.values()) - 1)
+
+    def put(self, value):
+        self.cache.put(self.properties[value]['sha256_hash'], self.properties[value])
+
+    def get(self, value):
+        return self.cache.get(self.properties[value]['sha256_hash'])
+
+    def test_evicts_least_recently_used(self):
+        self.put('alpha')
+        self.put('beta')
+        self.assertIs(self.get('alpha'), self.properties['alpha'])
+        self.put('gamma')
+        self.assertIsNone(self.get('beta'))
+        self.assertIsNotNone(self.get('alpha'))
+        self.assertIsNotNone(self.get('gamma'))
+        stats = self.cache.stats()
+        self.assertEqual(stats['bytes'], self.sizes['alpha'] + self.sizes['gamma'])
+        self.assertEqual(
+            (stats['entries'], stats['hits'], stats['misses'], stats['evictions']),
+            (2, 3, 1, 1),
+        )
+
+    def test_entry_over_budget_is_not_stored(self):
+        cache = PropertiesCache(self.sizes['alpha'] - 1)
+        cache.put(self.properties['alpha']['sha256_hash'], self.properties['alpha'])
+        self.assertEqual((cache.stats()['entries'], cache.stats()['bytes']), (0, 0))
+
+    def test_compute_string_properties_cached(self):
+        with unittest.mock.patch.object(cache, 'properties_cache', self.cache):
+            # A subset with nothing cached is computed and not cached
+            self.assertEqual(cache.compute_string_properties_cached('alpha', ['length']), {'length': 5})
+            self.assertEqual(self.cache.stats()['entries'], 0)
+            first = cache.compute_string_properties_cached('alpha')
+            self.assertEqual(first, self.properties['alpha'])
+            self.assertIs(cache.compute_string_properties_cached('alpha'), first)
+            # A subset is then answered from the full entry
+            self.assertEqual(
+                cache.compute_string_properties_cached('alpha', ['word_count', 'length']),
+                {'length': 5, 'word_count': 1},
+            )
+            stats = self.cache.stats()
+            self.assertEqual((stats['hits'], stats['misses'], stats['bytes']), (2, 2, self.sizes['alpha']))
+
+
+class PayloadCacheTests(SimpleTestCase):
+    """The detail body LRU counts entries by sys.getsizeof, evicts the least
+    recently used first and drops entries older than max_age."""
+
+    entries = {
+        'a' * 64: ('"a-1"', b'{"value":"a"}'),
+        'b' * 64: ('"b-1"', b'{"value":"bb"}'),
+        'c' * 64: ('"c-1"', b'{"value":"ccc"}'),
+    }
+
+    def setUp(self):
+        self.sizes = {key: sys.getsizeof(etag) + sys.getsizeof(payload) for key, (etag, payload) in self.entries.items()}
+        self.cache = PayloadCache(sum(self.sizes.values()) - 1, max_age=5)
+
+    def test_evicts_least_recently_used(self):
+        a, b, c = self.entries
+        self.cache.put(a, self.entries[a])
+        self.cache.put(b, self.entries[b])
+        self.assertEqual(self.cache.get(a), self.entries[a])
+        self.cache.put(c, self.entries[c])
+        self.assertIsNone(self.cache.get(b))
+        self.assertEqual(self.cache.stats()['bytes'], self.sizes[a] + self.sizes[c])
+        # Replacing an entry does not count it twice
+        self.cache.put(a, self.entries[a])
+        self.assertEqual(self.cache.stats()['bytes'], self.sizes[a] + self.sizes[c])
+
+    def test_expires_after_max_age(self):
+        a = next(iter(self.entries))
+        with unittest.mock.patch('strings.cache.time.monotonic', return_value=1000.0):
+            self.cache.put(a, self.entries[a])
+        with unittest.mock.patch('strings.cache.time.monotonic', return_value=1004.0):
+            self.assertEqual(self.cache.get(a), self.entries[a])
+        with unittest.mock.patch('strings.cache.time.monotonic', return_value=1005.5):
+            self.assertIsNone(self.cache.get(a))
+        self.assertEqual((self.cache.stats()['entries'], self.cache.stats()['bytes']), (0, 0))
+
+
+class FilterIndexTests(TestCase):
+    """EXPLAIN the list and natural-language filters and check that each
+    is answered from one of the filter indexes rather than a full scan."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Mostly non-palindromes of spread-out lengths and word counts, like
+        # real data, so the planner statistics are meaningful
+        values = ['racecar', 'level', 'noon', 'step on no pets']
+        values += [' '.join(['word%d' % i] * (i % 7 + 1)) for i in range(400)]
+        for value in values:
+            StringAnalysis.create_from_properties(value, compute_string_properties(value))
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            # Tiny test tables are cheaper to scan; make the planner show
+            # whether an index is usable at all
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, *index_names):
+        plan = queryset.explain()
+        self.assertTrue(
+            any(name in plan for name in index_names),
+            f'Expected one of {index_names} in plan:\n{plan}',
+        )
+
+    def test_default_ordering_uses_created_at_index(self):
+        self.assertUsesIndex(StringAnalysis.objects.all(), 'string_created_at_idx')
+
+    def test_length_range(self):
+        self.assertUsesIndex(
+            StringAnalysis.objects.filter(length__gte=5, length__lte=10),
+            'string_length_idx',
+        )
+
+    def test_word_count(self):
+        self.assertUsesIndex(
+            StringAnalysis.objects.filter(word_count=1),
+            'string_word_count_length_idx',
+        )
+
+    def test_word_count_and_length(self):
+        self.assertUsesIndex(
+            StringAnalysis.objects.filter(word_count=2, length__gte=3),
+            'string_word_count_length_idx',
+        )
+
+    def test_palindrome_and_length(self):
+        self.assertUsesIndex(
+            StringAnalysis.objects.filter(is_palindrome=True, length__gte=5),
+            'string_palindrome_length_idx',
+        )
+
+    def test_palindrome_and_word_count(self):
+        self.assertUsesIndex(
+            StringAnalysis.objects.filter(is_palindrome=True, word_count=1),
+            'string_palindrome_words_idx',
+        )
+
+
+class CharacterMaskTests(TestCase):
+    """contains_character filters give the same answer whether or not
+    character_mask has been backfilled, and the character index has the
+    last word."""
+
+    values = ['Eerie tree', 'bee', 'apple pie', 'kayak', 'ÉCOLE école', 'abc123']
+
+    @classmethod
+    def setUpTestData(cls):
+        for value in cls.values:
+            StringAnalysis.create_from_properties(value, compute_string_properties(value))
+
+    def matches(self):
+        queries = [
+            StringAnalysis.objects.containing('e'),
+            StringAnalysis.objects.containing('E', 3),
+            StringAnalysis.objects.containing('3'),
+            StringAnalysis.objects.containing('é'),
+            StringAnalysis.objects.containing_all('ae'),
+            StringAnalysis.objects.containing_all('eé'),
+        ]
+        return [sorted(queryset.values_list('value', flat=True)) for queryset in queries]
+
+    def test_mask_and_index_agree(self):
+        expected = [
+            ['Eerie tree', 'apple pie', 'bee', 'ÉCOLE école'],
+            ['Eerie tree'],
+            ['abc123'],
+            ['ÉCOLE école'],
+            ['apple pie'],
+            ['ÉCOLE école'],
+        ]
+        self.assertEqual(self.matches(), expected)
+        StringAnalysis.objects.update(character_mask=None)
+        self.assertEqual(self.matches(), expected)
+
+    def test_index_decides(self):
+        # The mask only rules rows out; a set bit still needs the index row
+        StringAnalysis.objects.filter(value='bee').update(character_mask=utils.character_class_mask('kz'))
+        self.assertEqual(list(StringAnalysis.objects.containing('k').values_list('value', flat=True)), ['kayak'])
+        self.assertFalse(StringAnalysis.objects.containing_all('kz').exists())
+        self.assertFalse(StringAnalysis.objects.filter(value='bee').containing('e').exists())
+
+    def test_backfill_command(self):
+        masks = dict(StringAnalysis.objects.values_list('pk', 'character_mask'))
+        StringAnalysis.objects.update(character_mask=None)
+        call_command('backfill_character_masks', batch_size=4, stdout=StringIO())
+        self.assertEqual(dict(StringAnalysis.objects.values_list('pk', 'character_mask')), masks)
+
+
+class FastSerializerTests(TestCase):
+    """fast_serializer writes the same bytes as StringAnalysisSerializer and
+    JSONRenderer, with orjson and with the json module."""
+
+    values = ['racecar', 'café 中文 😀', 'tab\tquote" back\\ ctl\x01', 'line\u2028para\u2029', 'a' * 300]
+
+    @classmethod
+    def setUpTestData(cls):
+        for value in cls.values:
+            StringAnalysis.create_from_properties(value, compute_string_properties(value))
+
+    def assertMatchesSerializer(self):
+        for fields in [None, ['id'], parse_field_names('value,created_at'), parse_field_names('properties')]:
+            # An append leaves is_palindrome unknown until a read fills it in
+            StringAnalysis.objects.filter(value='racecar').update(is_palindrome=None)
+            rows = StringAnalysis.objects.values_list(*fast_serializer.row_columns(fields), named=True)
+            analyses = only_fields(StringAnalysis.objects.all(), fields)
+            expected = [
+                JSONRenderer().render(StringAnalysisSerializer(analysis, fields=fields).data)
+                for analysis in analyses.order_by('pk')
+            ]
+            self.assertEqual(fast_serializer.render_rows(rows.order_by('pk'), fields), expected)
+
+    def test_orjson(self):
+        if fast_serializer.orjson is None:
+            self.skipTest('orjson is not installed')
+        self.assertMatchesSerializer()
+
+    def test_json_module(self):
+        with unittest.mock.patch.object(fast_serializer, 'orjson', None):
+            self.assertMatchesSerializer()
+
+    def test_rendered_payloads(self):
+        expected = [
+            JSONRenderer().render(StringAnalysisSerializer(analysis).data)
+            for analysis in StringAnalysis.objects.order_by('pk')
+        ]
+        rows = StringAnalysis.objects.values_list(*RENDERED_COLUMNS, named=True).order_by('pk')
+        # Rendered and stored on the first read, spliced from storage after
+        self.assertEqual(rendered_payloads(list(rows)), expected)
+        self.assertEqual(rendered_payloads(list(rows)), expected)
+        for stored in StringAnalysis.objects.values_list('rendered_json', flat=True):
+            self.assertNotIn(b'"value"', bytes(stored))
+
+
+def _put_in_child(path, key, payload):
+    SharedPayloadCache(path, 16, 128).put(key, payload)
+
+
+@unittest.skipUnless(shared_cache_available(), 'needs fcntl')
+class SharedPayloadCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'payloads')
+        self.cache = SharedPayloadCache(self.path, 16, 128)
+
+    @staticmethod
+    def key(value):
+        return hashlib.sha256(value.encode()).hexdigest()
+
+    def test_put_get_delete(self):
+        self.cache.put(self.key('a'), b'{"a":1}')
+        self.assertEqual(self.cache.get(self.key('a')), b'{"a":1}')
+        self.assertIsNone(self.cache.get(self.key('b')))
+        self.cache.delete(self.key('a'))
+        self.assertIsNone(self.cache.get(self.key('a')))
+
+    def test_payload_larger_than_slot_is_not_stored(self):
+        self.cache.put(self.key('a'), b'x' * 128)
+        self.assertIsNone(self.cache.get(self.key('a')))
+
+    def test_delete_leaves_other_key_in_slot(self):
+        keys = [self.key(str(i)) for i in range(64)]
+        first = keys[0]
+        other = next(key for key in keys[1:] if self.cache._slot(bytes.fromhex(key)) == self.cache._slot(bytes.fromhex(first)))
+        self.cache.put(first, b'first')
+        self.cache.put(other, b'other')
+        self.assertIsNone(self.cache.get(first))
+        self.cache.delete(first)
+        self.assertEqual(self.cache.get(other), b'other')
+
+    def test_detail_entries_keep_their_etag(self):
+        # What another worker put is read back from the shared tier alone
+        with unittest.mock.patch.object(cache, 'shared_detail_cache', self.cache):
+            cache.put_detail_payload(self.key('a'), '"etag"', b'{"a":1}')
+            detail_cache.clear()
+            self.assertEqual(cache.get_detail_payload(self.key('a')), ('"etag"', b'{"a":1}'))
+            self.assertEqual(detail_cache.get(self.key('a')), ('"etag"', b'{"a":1}'))
+
+    def test_other_geometry_uses_its_own_file(self):
+        self.cache.put(self.key('a'), b'small slots')
+        other = SharedPayloadCache(self.path, 32, 256)
+        other.put(self.key('a'), b'large slots')
+        self.assertNotEqual(other.path, self.cache.path)
+        self.assertEqual(self.cache.get(self.key('a')), b'small slots')
+        self.assertEqual(os.path.getsize(self.cache.path), 16 * 128)
+
+    def test_file_of_wrong_size_disables_cache(self):
+        self.cache.put(self.key('a'), b'payload')
+        # Same name, different size: left alone rather than truncated
+        with open(self.cache.path, 'ab') as stale:
+            stale.write(b'x')
+        other = SharedPayloadCache(self.path, 16, 128)
+        other.put(self.key('b'), b'payload')
+        self.assertIsNone(other.get(self.key('a')))
+        self.assertTrue(other.stats()['disabled'])
+        self.assertEqual(os.path.getsize(self.cache.path), 16 * 128 + 1)
+
+    def test_visible_to_other_processes(self):
+        process = multiprocessing.get_context('fork').Process(
+            target=_put_in_child, args=(self.path, self.key('a'), b'from child')
+        )
+        process.start()
+        process.join()
+        self.assertEqual(self.cache.get(self.key('a')), b'from child')
@@ -1,13 +1,25 @@
-from django.urls import path
+from django.urls import path, re_path
 from . import views
 
 urlpatterns = [
     # Handle both POST and GET for /strings
     path('strings', views.StringsView.as_view(), name='strings'),
     
+    # Stateless analysis, nothing is stored
+    path('analyze', views.AnalyzeView.as_view(), name='analyze'),
+    
     # Natural language filter - moved BEFORE the detail pattern to avoid conflicts
     path('strings/filter-by-natural-language', views.natural_language_filter, name='natural-language-filter'),
     
+    # GET and DELETE by SHA-256, for callers that have the hash
+    re_path(r'^strings/id/(?P<sha256>[0-9a-f]{64})$', views.StringByIdView.as_view(), name='string-detail-by-id'),
+    
+    # Append a fragment to a stored string
+    path('strings/<str:string_value>/append', views.StringAppendView.as_view(), name='string-append'),
+    
+    # Hit ratios of this worker's caches
+    path('cache/stats', views.cache_stats, name='cache-stats'),
+    
     # Handle GET and DELETE for specific string
     path('strings/<str:string_value>', views.StringDetailView.as_view(), name='string-detail'),
 ]
\ No newline at end of file
@@ -1,39 +1,511 @@
+import atexit
+import contextlib
+import functools
 import hashlib
+import multiprocessing
+import os
 import re
+import tempfile
+import threading
 from collections import Counter
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 
-def compute_string_properties(value: str) -> Dict[str, Any]:
-    """Compute all properties for a given string."""
+# Translation tables for the fused analyzer. They operate on the UTF-8 bytes
+# of the value, which we already need for the SHA-256, so no extra str copies
+# are made while cleaning or counting words.
+_ASCII_LOWER = bytes.maketrans(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', b'abcdefghijklmnopqrstuvwxyz')
+_NON_ALNUM_BYTES = bytes(b for b in range(256) if not (b < 128 and chr(b).isalnum()))
+# Maps ASCII whitespace (as str.split() sees it) to b' ' and every other byte,
+# including UTF-8 lead/continuation bytes, to b'x'.
+_WORD_BOUNDARY_MAP = bytes(
+    0x20 if b < 128 and chr(b).isspace() else 0x78 for b in range(256)
+)
+# Non-ASCII characters that str.split() treats as whitespace.
+_NON_ASCII_WHITESPACE = tuple(
+    chr(c) for c in range(128, 0x3001) if chr(c).isspace()
+)
+
+
+def _count_words(value: str, encoded: bytes) -> int:
+    """Count whitespace separated words without building a list of words."""
+    if not value.isascii() and any(ws in value for ws in _NON_ASCII_WHITESPACE):
+        return len(value.split())
+    boundaries = encoded.translate(_WORD_BOUNDARY_MAP)
+    return boundaries.count(b' x') + (boundaries[:1] == b'x')
+
+
+def _palindrome_key(value: str, encoded: bytes) -> bytes:
+    """Lower-cased ASCII alphanumerics of value, the text palindromes compare."""
+    if value.isascii():
+        return encoded.translate(_ASCII_LOWER, _NON_ALNUM_BYTES)
+    # lower() can map some non-ASCII characters onto ASCII letters, so it
+    # has to run before non-ASCII characters are dropped.
+    return value.lower().encode('ascii', 'ignore').translate(None, _NON_ALNUM_BYTES)
+
+
+def _is_palindrome(value: str, encoded: bytes) -> bool:
+    """Case-insensitive palindrome check over ASCII alphanumerics only."""
+    cleaned = _palindrome_key(value, encoded)
+    if not cleaned:
+        return False
+    # Two-pointer comparison: the first half against the mirrored second half.
+    half = len(cleaned) // 2
+    return cleaned[:half] == cleaned[:-half - 1:-1] if half else True
+
+
+def _character_frequency_map(value: str, encoded: bytes) -> Dict[str, int]:
+    """Character counts in first-occurrence order, like dict(Counter(value))."""
+    if value.isascii():
+        # Counting bytes is cheaper than counting one-character str objects.
+        return {chr(byte): count for byte, count in Counter(encoded).items()}
+    return dict(Counter(value))
+
+
+# Bit per case-folded ASCII letter (0-25) and digit (26-35) for character_class_mask()
+CHARACTER_CLASS_BITS = {char: 1 << bit for bit, char in enumerate('abcdefghijklmnopqrstuvwxyz0123456789')}
+
+
+def character_class_mask(chars: Iterable[str]) -> int:
+    """Bitmask of the ASCII letters and digits among chars, ignoring case.
+
+    Pass the keys of a frequency map rather than the value itself. Other
+    characters contribute nothing, so a clear bit only rules out its own
+    letter or digit.
+    """
+    mask = 0
+    for char in chars:
+        mask |= CHARACTER_CLASS_BITS.get(char.lower(), 0)
+    return mask
+
+
+# Property names in the order compute_string_properties() returns them
+PROPERTY_NAMES = (
+    'length',
+    'is_palindrome',
+    'unique_characters',
+    'word_count',
+    'sha256_hash',
+    'character_frequency_map',
+)
+
+
+def parse_property_names(raw: str) -> List[str]:
+    """Parse a comma-separated ?properties= list, rejecting unknown names."""
+    names = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = [name for name in names if name not in PROPERTY_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown properties: {', '.join(unknown)}")
+    if not names:
+        raise ValueError('No properties requested')
+    return names
+
+
+def compute_string_properties(value: str, properties: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Compute all properties for a given string.
+
+    The value is encoded to UTF-8 once; the hash, palindrome check and word
+    count all work on those bytes, and the unique character count falls out
+    of the frequency map instead of a separate set().
     
-    # Basic properties
-    length = len(value)
+    If properties names a subset of PROPERTY_NAMES, only those are computed.
+    Values of PARALLEL_ANALYSIS_THRESHOLD characters or more are split
+    across the batch process pool (see compute_string_properties_parallel).
+    """
     
-    # Palindrome check (case-insensitive) - only consider alphanumeric characters
-    cleaned_value = re.sub(r'[^a-zA-Z0-9]', '', value.lower())
-    is_palindrome = cleaned_value == cleaned_value[::-1] if cleaned_value else False
+    if properties is not None:
+        return _compute_selected_properties(value, set(properties))
     
-    # Unique characters count
-    unique_characters = len(set(value))
+    # SHA256 hash - MUST use UTF-8 encoding
+    encoded = value.encode('utf-8')
+    if _use_parallel_analysis(value):
+        return _analyze_parallel(value, encoded)
+    sha256_hash = hashlib.sha256(encoded).hexdigest()
     
-    # Word count (split by whitespace)
-    word_count = len(value.split())
+    return _analyze_serial(value, encoded, sha256_hash)
+
+
+def analyze_encoded(value: str, encoded: bytes, sha256_hash: str) -> Dict[str, Any]:
+    """compute_string_properties() for callers that already hold the UTF-8
+    bytes and hash of value."""
     
-    # SHA256 hash - MUST use UTF-8 encoding
-    sha256_hash = hashlib.sha256(value.encode('utf-8')).hexdigest()
+    if _use_parallel_analysis(value):
+        return _analyze_parallel(value, encoded, sha256_hash)
+    return _analyze_serial(value, encoded, sha256_hash)
+
+
+def _analyze_serial(value: str, encoded: bytes, sha256_hash: str) -> Dict[str, Any]:
+    # Character frequency map, which also gives the unique characters count
+    character_frequency_map = _character_frequency_map(value, encoded)
+    
+    return {
+        'length': len(value),
+        'is_palindrome': _is_palindrome(value, encoded),
+        'unique_characters': len(character_frequency_map),
+        'word_count': _count_words(value, encoded),
+        'sha256_hash': sha256_hash,
+        'character_frequency_map': character_frequency_map
+    }
+
+
+def _compute_selected_properties(value: str, wanted: set) -> Dict[str, Any]:
+    """Compute only the wanted properties, in PROPERTY_NAMES order."""
+    # Only length and a set()-based unique count can skip the UTF-8 bytes
+    encoded = value.encode('utf-8') if wanted - {'length', 'unique_characters'} else b''
+    
+    character_frequency_map = None
+    if 'character_frequency_map' in wanted:
+        character_frequency_map = _character_frequency_map(value, encoded)
+    
+    result = {}
+    if 'length' in wanted:
+        result['length'] = len(value)
+    if 'is_palindrome' in wanted:
+        result['is_palindrome'] = _is_palindrome(value, encoded)
+    if 'unique_characters' in wanted:
+        # A set is much cheaper than counting when the counts aren't needed
+        result['unique_characters'] = (
+            len(character_frequency_map) if character_frequency_map is not None else len(set(value))
+        )
+    if 'word_count' in wanted:
+        result['word_count'] = _count_words(value, encoded)
+    if 'sha256_hash' in wanted:
+        result['sha256_hash'] = hashlib.sha256(encoded).hexdigest()
+    if character_frequency_map is not None:
+        result['character_frequency_map'] = character_frequency_map
+    return result
+
+
+def append_string_properties(
+    properties: Dict[str, Any], fragment: str, ends_in_word: bool, sha256_hash: str
+) -> Dict[str, Any]:
+    """Properties of value + fragment, given the properties of value.
+
+    Only the fragment is scanned. ends_in_word says whether value ends in a
+    non-whitespace character, in which case a fragment that starts with one
+    continues that word. is_palindrome needs the whole text and is returned
+    as None.
+    """
+    encoded = fragment.encode('utf-8')
+    
+    character_frequency_map = dict(properties['character_frequency_map'])
+    for char, count in _character_frequency_map(fragment, encoded).items():
+        character_frequency_map[char] = character_frequency_map.get(char, 0) + count
     
-    # Character frequency map
-    character_frequency_map = dict(Counter(value))
+    word_count = properties['word_count'] + _count_words(fragment, encoded)
+    if ends_in_word and fragment and not fragment[0].isspace():
+        word_count -= 1
     
     return {
-        'length': length,
+        'length': properties['length'] + len(fragment),
+        'is_palindrome': None,
+        'unique_characters': len(character_frequency_map),
+        'word_count': word_count,
+        'sha256_hash': sha256_hash,
+        'character_frequency_map': character_frequency_map
+    }
+
+
+# Batches smaller than this are analyzed in-process; shipping them to the
+# pool costs more in pickling than the analysis itself.
+SERIAL_BATCH_THRESHOLD = 256
+
+# A single shared pool. A call asking for another size replaces it; the
+# old pool is closed once no thread is using it any more, so work running
+# on it is never cut off.
+_batch_pool = None
+_batch_pool_size = None
+_batch_pool_users = {}
+_batch_pool_lock = threading.Lock()
+
+
+def _release_batch_pool(pool) -> None:
+    # Called with _batch_pool_lock held
+    _batch_pool_users[pool] -= 1
+    if not _batch_pool_users[pool] and pool is not _batch_pool:
+        del _batch_pool_users[pool]
+        # close() lets the workers finish and exit without blocking here
+        pool.close()
+
+
+@contextlib.contextmanager
+def _using_batch_pool(processes: int):
+    """The shared worker pool, resized to processes if needed, held for the
+    duration of the with block."""
+    global _batch_pool, _batch_pool_size
+    with _batch_pool_lock:
+        if _batch_pool is None or _batch_pool_size != processes:
+            old_pool = _batch_pool
+            _batch_pool = multiprocessing.Pool(processes)
+            _batch_pool_size = processes
+            _batch_pool_users[_batch_pool] = 0
+            if old_pool is not None:
+                _batch_pool_users[old_pool] += 1
+                _release_batch_pool(old_pool)
+        pool = _batch_pool
+        _batch_pool_users[pool] += 1
+    try:
+        yield pool
+    finally:
+        with _batch_pool_lock:
+            _release_batch_pool(pool)
+
+
+def shutdown_batch_pool() -> None:
+    """Stop the shared worker pool used by compute_string_properties_batch."""
+    global _batch_pool, _batch_pool_size
+    with _batch_pool_lock:
+        for pool in _batch_pool_users:
+            pool.terminate()
+            pool.join()
+        _batch_pool_users.clear()
+        _batch_pool = None
+        _batch_pool_size = None
+
+
+atexit.register(shutdown_batch_pool)
+
+
+def compute_string_properties_batch(
+    values: Iterable[str],
+    mode: str = 'auto',
+    processes: Optional[int] = None,
+    properties: Optional[Iterable[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Compute properties for many strings, returning results in input order.
+
+    mode is 'serial', 'process', 'vectorized' (NumPy, see
+    strings.vectorized) or 'auto' (serial below SERIAL_BATCH_THRESHOLD
+    values). The process pool is kept alive between calls so its start-up
+    cost is paid once per process. properties selects a subset as in
+    compute_string_properties().
+    """
+    if mode not in ('auto', 'serial', 'process', 'vectorized'):
+        raise ValueError(f'Unknown batch mode: {mode!r}')
+    
+    values = list(values)
+    if properties is not None:
+        properties = frozenset(properties)
+    
+    if mode == 'vectorized':
+        from .vectorized import compute_string_properties_vectorized
+        results = compute_string_properties_vectorized(values)
+        if properties is not None:
+            results = [{name: result[name] for name in PROPERTY_NAMES if name in properties} for result in results]
+        return results
+    if mode == 'auto':
+        mode = 'serial' if len(values) < SERIAL_BATCH_THRESHOLD else 'process'
+    
+    if mode == 'serial' or not values:
+        return [compute_string_properties(value, properties) for value in values]
+    
+    processes = processes or os.cpu_count() or 1
+    # A few chunks per worker keeps them busy when string sizes are uneven
+    chunksize = max(1, -(-len(values) // (processes * 4)))
+    with _using_batch_pool(processes) as pool:
+        return pool.map(functools.partial(compute_string_properties, properties=properties), values, chunksize)
+
+
+# Strings at least this long are counted in parallel chunks; below it the
+# pool round trip costs more than it saves.
+PARALLEL_ANALYSIS_THRESHOLD = 8_000_000
+
+
+def _use_parallel_analysis(value: str) -> bool:
+    # Pool workers are daemonic and cannot start a pool of their own
+    return (
+        len(value) >= PARALLEL_ANALYSIS_THRESHOLD
+        and (os.cpu_count() or 1) > 1
+        and multiprocessing.parent_process() is None
+    )
+
+
+def _analyze_chunk(chunk: str):
+    """Per-chunk frequencies and word count, merged by _analyze_parallel."""
+    encoded = chunk.encode('utf-8')
+    return _character_frequency_map(chunk, encoded), _count_words(chunk, encoded)
+
+
+def _analyze_parallel(
+    value: str, encoded: bytes, sha256_hash: Optional[str] = None, processes: Optional[int] = None
+) -> Dict[str, Any]:
+    processes = processes or os.cpu_count() or 1
+    chunk_size = -(-len(value) // (processes * 2))
+    starts = range(0, len(value), chunk_size)
+    
+    # hashlib releases the GIL on large inputs, so the hash runs in a thread
+    # alongside everything else
+    digest = {}
+    hash_thread = None
+    if sha256_hash is None:
+        hash_thread = threading.Thread(
+            target=lambda: digest.setdefault('sha256_hash', hashlib.sha256(encoded).hexdigest())
+        )
+        hash_thread.start()
+    
+    with _using_batch_pool(processes) as pool:
+        # Chunks are sliced lazily as the pool feeds them to workers
+        chunk_results = pool.imap(_analyze_chunk, (value[start:start + chunk_size] for start in starts))
+        
+        # The palindrome check is cheap C work on the bytes; the parent does
+        # it while the workers count
+        is_palindrome = _is_palindrome(value, encoded)
+        
+        # Merging chunk maps in order keeps the first-occurrence key order
+        character_frequency_map = {}
+        word_count = 0
+        for start, (frequencies, words) in zip(starts, chunk_results):
+            for char, count in frequencies.items():
+                character_frequency_map[char] = character_frequency_map.get(char, 0) + count
+            # A word running across the chunk boundary was counted twice
+            if start and not value[start - 1].isspace() and not value[start].isspace():
+                words -= 1
+            word_count += words
+    
+    if hash_thread is not None:
+        hash_thread.join()
+        sha256_hash = digest['sha256_hash']
+    
+    return {
+        'length': len(value),
         'is_palindrome': is_palindrome,
-        'unique_characters': unique_characters,
+        'unique_characters': len(character_frequency_map),
         'word_count': word_count,
         'sha256_hash': sha256_hash,
         'character_frequency_map': character_frequency_map
     }
 
+
+def compute_string_properties_parallel(value: str, processes: Optional[int] = None) -> Dict[str, Any]:
+    """compute_string_properties() with the value split across processes.
+
+    Frequencies and word counts are computed per chunk and merged (word
+    counts are fixed up at chunk boundaries); the SHA-256 runs in a thread
+    and the palindrome check in this process meanwhile.
+    """
+    return _analyze_parallel(value, value.encode('utf-8'), processes=processes)
+
+
+def strip_text_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    """Yield the chunks of a text stream as if the whole text were strip()ped.
+
+    Trailing whitespace is held back until non-whitespace follows it, so it
+    is dropped at the end of the stream.
+    """
+    started = False
+    pending = []
+    for chunk in chunks:
+        if not started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                continue
+            started = True
+        body = chunk.rstrip()
+        if body:
+            yield from pending
+            pending.clear()
+            yield body
+        if len(body) != len(chunk):
+            pending.append(chunk[len(body):])
+
+
+class StreamingStringAnalyzer:
+    """Compute compute_string_properties() over a string fed in chunks.
+
+    Only running totals are kept in memory. The palindrome check needs the
+    whole text, so its lower-cased alphanumerics are spooled to a temporary
+    file and compared from both ends once the stream is complete. With
+    keep_value=True the UTF-8 value is spooled too, for callers that have to
+    store it.
+    """
+
+    def __init__(self, spool_max_size: int = 1024 * 1024, keep_value: bool = False):
+        self._sha256 = hashlib.sha256()
+        self._frequencies: Dict[str, int] = {}
+        self._length = 0
+        self._word_count = 0
+        self._in_word = False
+        self._palindrome_spool = tempfile.SpooledTemporaryFile(max_size=spool_max_size)
+        self._value_spool = (
+            tempfile.SpooledTemporaryFile(max_size=spool_max_size) if keep_value else None
+        )
+
+    def update(self, chunk: str) -> None:
+        """Feed the next piece of the string."""
+        if not chunk:
+            return
+        encoded = chunk.encode('utf-8')
+        self._sha256.update(encoded)
+        self._length += len(chunk)
+        
+        for char, count in _character_frequency_map(chunk, encoded).items():
+            self._frequencies[char] = self._frequencies.get(char, 0) + count
+        
+        # A word running across the chunk boundary was counted in both chunks
+        words = _count_words(chunk, encoded)
+        if self._in_word and not chunk[0].isspace():
+            words -= 1
+        self._word_count += words
+        self._in_word = not chunk[-1].isspace()
+        
+        self._palindrome_spool.write(_palindrome_key(chunk, encoded))
+        if self._value_spool is not None:
+            self._value_spool.write(encoded)
+
+    def _is_palindrome(self, block_size: int = 64 * 1024) -> bool:
+        spool = self._palindrome_spool
+        left, right = 0, spool.seek(0, os.SEEK_END)
+        if not right:
+            return False
+        while right - left > 1:
+            size = min(block_size, (right - left) // 2)
+            spool.seek(left)
+            head = spool.read(size)
+            spool.seek(right - size)
+            tail = spool.read(size)
+            if head != tail[::-1]:
+                return False
+            left += size
+            right -= size
+        return True
+
+    def result(self) -> Dict[str, Any]:
+        """Properties of everything fed so far, shaped like compute_string_properties()."""
+        return {
+            'length': self._length,
+            'is_palindrome': self._is_palindrome(),
+            'unique_characters': len(self._frequencies),
+            'word_count': self._word_count,
+            'sha256_hash': self._sha256.hexdigest(),
+            'character_frequency_map': dict(self._frequencies)
+        }
+
+    def read_value(self) -> str:
+        """Read back the spooled value (requires keep_value=True).
+
+        This ends the analysis: the spools are released before the bytes are
+        decoded, so at most the bytes and the str are alive together.
+        """
+        if self._value_spool is None:
+            raise ValueError('Analyzer was created without keep_value=True')
+        self._palindrome_spool.close()
+        self._value_spool.seek(0)
+        encoded = self._value_spool.read()
+        self._value_spool.close()
+        self._value_spool = None
+        return encoded.decode('utf-8')
+
+    def close(self) -> None:
+        self._palindrome_spool.close()
+        if self._value_spool is not None:
+            self._value_spool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
 def parse_natural_language_query(query: str) -> Dict[str, Any]:
     """Parse natural language query into filters using keyword detection."""
     query = query.lower().strip()
@@ -77,13 +549,26 @@ def parse_natural_language_query(query: str) -> Dict[str, Any]:
             print(f"  → Detected: max_length = {max_length - 1}")
     
     # Character containment
-    if "containing the letter" in query:
+    # Count predicates: "at least 3 occurrences of e", "at least 2 e's"
+    match = re.search(r"at least\s+(\d+)\s+(?:occurrences of\s+)?(?:the letter\s+)?'?([a-zA-Z])\b", query)
+    if match:
+        filters['contains_character'] = match.group(2).lower()
+        filters['min_character_count'] = int(match.group(1))
+        print(f"  → Detected: at least {match.group(1)} × '{match.group(2).lower()}'")
+    
+    # All of several letters: "containing the letters a, e and i"
+    match = re.search(r'containing the letters\s+([a-zA-Z](?:\s*(?:,|and)\s*[a-zA-Z])+)\b', query)
+    if match:
+        filters['contains_all'] = ''.join(re.findall(r'\b[a-zA-Z]\b', match.group(1))).lower()
+        print(f"  → Detected: contains_all = '{filters['contains_all']}'")
+    
+    if "containing the letter" in query and 'contains_character' not in filters:
         match = re.search(r'containing the letter\s+([a-zA-Z])', query)
         if match:
             filters['contains_character'] = match.group(1).lower()
             print(f"  → Detected: contains_character = '{match.group(1).lower()}'")
     
-    if "containing the letter" not in query and "contain" in query:
+    if "containing the letter" not in query and "contain" in query and 'contains_character' not in filters:
         # Look for pattern like "contains a" or "containing e"
         match = re.search(r'contain[s]?[\w\s]*([a-zA-Z])', query)
         if match:
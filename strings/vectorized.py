@@ -0,0 +1,126 @@
+"""NumPy implementation of compute_string_properties() for whole corpora.
+
+All strings are concatenated into one codepoint array and every property is
+computed with array operations over it, keyed by which string each
+codepoint came from. Without NumPy the scalar analyzer is used instead.
+"""
+import hashlib
+from typing import Any, Dict, List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from .utils import _NON_ASCII_WHITESPACE, compute_string_properties
+
+# Codepoints are below 2**21, so (string index, codepoint) pairs pack into
+# one uint64 key.
+_CODEPOINT_BITS = 21
+
+_WHITESPACE_CODEPOINTS = sorted(
+    [c for c in range(128) if chr(c).isspace()] + [ord(ws) for ws in _NON_ASCII_WHITESPACE]
+)
+
+# The only non-ASCII characters whose lower() contains an ASCII letter or
+# digit (U+0130 -> 'i' + combining dot, KELVIN SIGN -> 'k'). Everything else
+# non-ASCII is dropped by the palindrome cleaning.
+_NON_ASCII_LOWER_TO_ASCII = {0x130: ord('i'), 0x212A: ord('k')}
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+def _palindrome_flags(codepoints, segment_ids, count):
+    """Per-string palindrome flags over lower-cased ASCII alphanumerics."""
+    lowered = codepoints.copy()
+    upper = (lowered >= ord('A')) & (lowered <= ord('Z'))
+    lowered[upper] += ord('a') - ord('A')
+    for source, target in _NON_ASCII_LOWER_TO_ASCII.items():
+        lowered[lowered == source] = target
+
+    keep = (
+        ((lowered >= ord('a')) & (lowered <= ord('z')))
+        | ((lowered >= ord('0')) & (lowered <= ord('9')))
+    )
+    cleaned = lowered[keep]
+    cleaned_ids = segment_ids[keep]
+
+    cleaned_lengths = np.bincount(cleaned_ids, minlength=count)
+    cleaned_ends = np.cumsum(cleaned_lengths)
+    cleaned_starts = cleaned_ends - cleaned_lengths
+
+    # Position j of a string spanning [start, end) mirrors start + end - 1 - j
+    mirror = cleaned_starts[cleaned_ids] + cleaned_ends[cleaned_ids] - 1 - np.arange(len(cleaned))
+    mismatches = np.bincount(cleaned_ids[cleaned != cleaned[mirror]], minlength=count)
+    return (cleaned_lengths > 0) & (mismatches == 0)
+
+
+def compute_string_properties_vectorized(values: Sequence[str]) -> List[Dict[str, Any]]:
+    """compute_string_properties() for every value, computed column-wise.
+
+    Falls back to the scalar analyzer when NumPy is not installed.
+    """
+    values = list(values)
+    if np is None:
+        return [compute_string_properties(value) for value in values]
+    if not values:
+        return []
+
+    count = len(values)
+    joined = ''.join(values)
+    codepoints = np.frombuffer(joined.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    del joined
+
+    lengths = np.fromiter(map(len, values), dtype=np.int64, count=count)
+    starts = np.cumsum(lengths) - lengths
+    segment_ids = np.repeat(np.arange(count, dtype=np.int64), lengths)
+
+    # Character frequencies: count each (string, codepoint) pair, then put
+    # the pairs back in first-occurrence order to match dict(Counter(value))
+    keys = (segment_ids.astype(np.uint64) << _CODEPOINT_BITS) | codepoints
+    unique_keys, first_index, frequencies = np.unique(keys, return_index=True, return_counts=True)
+    order = np.argsort(first_index, kind='stable')
+    unique_keys = unique_keys[order]
+    frequencies = frequencies[order]
+    del keys, first_index, order
+
+    key_segments = (unique_keys >> _CODEPOINT_BITS).astype(np.int64)
+    unique_counts = np.bincount(key_segments, minlength=count)
+    map_ends = np.cumsum(unique_counts)
+    map_chars = list(map(chr, (unique_keys & ((1 << _CODEPOINT_BITS) - 1)).tolist()))
+    map_counts = frequencies.tolist()
+
+    # Word count: non-whitespace characters that start a string or follow
+    # whitespace
+    is_space = np.isin(codepoints, _WHITESPACE_CODEPOINTS)
+    follows_space = np.empty_like(is_space)
+    follows_space[1:] = is_space[:-1]
+    follows_space[starts[lengths > 0]] = True
+    word_counts = np.bincount(segment_ids[~is_space & follows_space], minlength=count)
+
+    palindromes = _palindrome_flags(codepoints, segment_ids, count)
+
+    # Back to Python objects in bulk; indexing NumPy arrays per row is slow
+    results = []
+    map_start = 0
+    rows = zip(
+        values,
+        lengths.tolist(),
+        palindromes.tolist(),
+        unique_counts.tolist(),
+        word_counts.tolist(),
+        map_ends.tolist(),
+    )
+    for value, length, is_palindrome, unique_characters, word_count, map_end in rows:
+        results.append({
+            'length': length,
+            'is_palindrome': is_palindrome,
+            'unique_characters': unique_characters,
+            'word_count': word_count,
+            'sha256_hash': hashlib.sha256(value.encode('utf-8')).hexdigest(),
+            'character_frequency_map': dict(zip(map_chars[map_start:map_end], map_counts[map_start:map_end]))
+        })
+        map_start = map_end
+    return results
@@ -1,17 +1,56 @@
-from rest_framework import status
+from rest_framework import serializers, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.conf import settings
 from django.shortcuts import get_object_or_404
-from django.db import IntegrityError
-from django.db.models import Q
+from django.urls import reverse
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, TextField, Value
+from django.db.models.functions import Concat, Substr
+import codecs
+import datetime
 import json
 
-from .models import StringAnalysis
-from .serializers import StringAnalysisSerializer
-from .utils import compute_string_properties, parse_natural_language_query
+from .models import CharacterOccurrence, CollectionVersion, StringAnalysis
+from .cache import (
+    compute_string_properties_cached,
+    delete_detail_payload,
+    detail_cache,
+    get_detail_payload,
+    properties_cache,
+    put_detail_payload,
+    result_cache,
+    shared_detail_cache,
+)
+from .frequency import (
+    compact_frequency_map_from_settings,
+    fold_frequency_map,
+    frequency_map_properties,
+    pack_frequency_map,
+)
+from .pagination import paginate
+from .fast_serializer import dumps, render_rows, row_columns, row_data
+from .rendered import RENDERED_COLUMNS, rendered_payloads, splice_response
+from .serializers import StringAnalysisSerializer, only_fields, parse_field_names
+from .sha256 import ResumableSHA256
+from .streaming import streaming_response
+from .tasks import store_analysis_in_background, store_sha256_state_in_background
+from .utils import (
+    PROPERTY_NAMES,
+    StreamingStringAnalyzer,
+    append_string_properties,
+    character_class_mask,
+    compute_string_properties,
+    compute_string_properties_batch,
+    parse_natural_language_query,
+    parse_property_names,
+    strip_text_chunks,
+)
 
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 
 def root_view(request):
     """Simple root view to handle base URL"""
@@ -19,21 +58,109 @@ def root_view(request):
         "message": "String Analyzer Service is running",
         "endpoints": {
             "POST /strings": "Create and analyze a string",
+            "POST /analyze": "Analyze one or more strings without storing them",
             "GET /strings/{string_value}": "Get specific string analysis", 
+            "GET /strings/id/{sha256}": "Get specific string analysis by its hash",
             "GET /strings": "Get all strings with filters",
             "GET /strings/filter-by-natural-language": "Filter using natural language",
-            "DELETE /strings/{string_value}": "Delete string analysis"
+            "DELETE /strings/{string_value}": "Delete string analysis",
+            "DELETE /strings/id/{sha256}": "Delete string analysis by its hash",
+            "PATCH /strings/{string_value}/append": "Append to a stored string",
+            "GET /cache/stats": "Cache hit ratios of the worker serving the request"
         }
     })
 
 
 
+def requested_fields(request):
+    """parse_field_names() of ?fields=, or None when every field is wanted."""
+    fields = request.GET.get('fields')
+    return parse_field_names(fields) if fields is not None else None
+
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def detail_etag(analysis_id, created_at):
+    """Strong ETag of a detail response: the row id, which changes with the
+    value, and when the row was created, which changes if the value is
+    deleted and stored again."""
+    created = (created_at - _EPOCH) // datetime.timedelta(microseconds=1)
+    return quote_etag(f'{analysis_id}-{created:x}')
+
+
+def detail_response(response, etag):
+    """Add the validators of an immutable detail response."""
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=settings.STRING_DETAIL_CACHE_MAX_AGE, immutable=True)
+    return response
+
+
+def cached_response(data):
+    """Response for a list body: JSON bytes spliced from stored rows, or data
+    for DRF to render."""
+    if isinstance(data, bytes):
+        return HttpResponse(data, content_type='application/json')
+    return Response(data)
+
+
+def collection_response(response, version):
+    """Tag a list response with the collection version it was built from;
+    caches must revalidate it, which is a 304 until the next write."""
+    response['ETag'] = quote_etag(f'v{version}')
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def collection_not_modified(request, version):
+    """304 response if If-None-Match has the current collection version."""
+    response = get_conditional_response(request, etag=quote_etag(f'v{version}'))
+    return collection_response(response, version) if response is not None else None
+
+
+def response_properties(properties):
+    """Computed properties with the frequency map reduced as it would be stored."""
+    if 'character_frequency_map' not in properties:
+        return properties
+    frequency_map = compact_frequency_map_from_settings(properties['character_frequency_map'])
+    return {**properties, **frequency_map_properties(*frequency_map)}
+
+
+def list_rows(request, fields, streaming):
+    """Rows to list, and how list_body() renders them: JSON responses read
+    values_list() rows (whole rows from their stored rendered_json), other
+    renderers get model instances for the DRF serializer."""
+    if streaming or request.accepted_renderer.format == 'json':
+        if fields is None and not streaming:
+            return StringAnalysis.objects.values_list(*RENDERED_COLUMNS, named=True), 'rendered'
+        return StringAnalysis.objects.values_list(*row_columns(fields), named=True), 'values'
+    return only_fields(StringAnalysis.objects.all(), fields), 'models'
+
+
+def list_body(page, rows, fields, extra):
+    """{"data": [...], **extra} for a page of list_rows(); bytes unless the
+    rows are model instances."""
+    if rows == 'rendered':
+        return splice_response(rendered_payloads(page), extra)
+    if rows == 'values':
+        return splice_response(render_rows(page, fields), extra)
+    return {'data': StringAnalysisSerializer(page, many=True, fields=fields).data, **extra}
+
+
 class StringsView(APIView):
     """Handle both POST and GET for /strings endpoint"""
     
+    # Bodies of these types are the raw string itself and are analyzed
+    # chunk by chunk instead of being parsed into request.data
+    STREAMING_CONTENT_TYPES = ('text/plain', 'application/octet-stream')
+    
     def post(self, request):
         """POST /strings - Create and analyze a string."""
         
+        content_type = request.content_type.split(';')[0].strip().lower()
+        if content_type in self.STREAMING_CONTENT_TYPES:
+            return self.post_stream(request)
+        
         # Check if value field exists
         if 'value' not in request.data:
             return Response(
@@ -56,31 +183,109 @@ class StringsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Check if string already exists
-        if StringAnalysis.objects.filter(value=value).exists():
+        # Check if string already exists (by primary key, the value's hash)
+        if StringAnalysis.objects.filter(id=StringAnalysis.id_for_value(value)).exists():
             return Response(
                 {'error': 'String already exists in the system'}, 
                 status=status.HTTP_409_CONFLICT
             )
         
-        # Compute properties
-        properties = compute_string_properties(value)
+        # ?properties=length,sha256_hash - answer with just those and
+        # store the complete row in the background
+        requested = request.GET.get('properties')
+        if requested:
+            try:
+                requested = parse_property_names(requested)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            
+            properties = compute_string_properties_cached(value, set(requested) | {'sha256_hash'})
+            store_analysis_in_background(value)
+            return Response({
+                'id': properties['sha256_hash'],
+                'value': value,
+                'properties': response_properties(
+                    {name: properties[name] for name in PROPERTY_NAMES if name in requested}
+                )
+            }, status=status.HTTP_202_ACCEPTED)
         
-        # Create analysis object
+        # Compute properties (memoized, values are often re-submitted)
+        properties = compute_string_properties_cached(value)
+        
+        return self.create_analysis(value, properties)
+    
+    def post_stream(self, request):
+        """POST /strings with a raw UTF-8 body, analyzed while it is read.
+        
+        Only one chunk of the body is in memory during analysis; the value
+        is read back from the spool only once we know it is not a duplicate.
+        """
+        chunk_size = settings.STRING_STREAM_CHUNK_SIZE
+        stream = request.stream
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        
+        def read_text():
+            while stream is not None:
+                block = stream.read(chunk_size)
+                if not block:
+                    break
+                yield decoder.decode(block)
+            yield decoder.decode(b'', final=True)
+        
+        with StreamingStringAnalyzer(
+            spool_max_size=settings.STRING_STREAM_SPOOL_MAX_SIZE, keep_value=True
+        ) as analyzer:
+            try:
+                for chunk in strip_text_chunks(read_text()):
+                    analyzer.update(chunk)
+            except UnicodeDecodeError:
+                return Response(
+                    {'error': 'Request body must be UTF-8 encoded text'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            properties = analyzer.result()
+            if not properties['length']:
+                return Response(
+                    {'error': 'String value cannot be empty'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            # The id is the SHA-256 of the value, so this is the same check
+            # as filtering on value without needing the value in memory
+            if StringAnalysis.objects.filter(id=properties['sha256_hash']).exists():
+                return Response(
+                    {'error': 'String already exists in the system'}, 
+                    status=status.HTTP_409_CONFLICT
+                )
+            
+            value = analyzer.read_value()
+        
+        # The client has the value already; echoing it would make another
+        # copy (and send it all back)
+        return self.create_analysis(value, properties, echo_value=False)
+    
+    def create_analysis(self, value, properties, echo_value=True):
+        """Store an analyzed value and return the 201 response.
+        
+        With echo_value=False the response leaves out value and points to
+        the stored string with a Location header instead.
+        """
         try:
-            analysis = StringAnalysis.objects.create(
-                id=properties['sha256_hash'],
-                value=value,
-                length=properties['length'],
-                is_palindrome=properties['is_palindrome'],
-                unique_characters=properties['unique_characters'],
-                word_count=properties['word_count'],
-                sha256_hash=properties['sha256_hash'],
-                character_frequency_map=properties['character_frequency_map']
-            )
+            analysis = StringAnalysis.create_from_properties(value, properties)
             
-            serializer = StringAnalysisSerializer(analysis)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            if echo_value:
+                serializer = StringAnalysisSerializer(analysis)
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            
+            analysis.value = None
+            serializer = StringAnalysisSerializer(analysis, fields=['id', 'created_at', *PROPERTY_NAMES])
+            location = reverse('string-detail-by-id', kwargs={'sha256': analysis.id})
+            return Response(
+                serializer.data, 
+                status=status.HTTP_201_CREATED, 
+                headers={'Location': self.request.build_absolute_uri(location)}
+            )
             
         except IntegrityError:
             return Response(
@@ -91,7 +296,25 @@ class StringsView(APIView):
     def get(self, request):
         """GET /strings - Get all strings with filtering."""
         
-        analyses = StringAnalysis.objects.all()
+        try:
+            fields = requested_fields(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Streamed exports are read fresh; pages come from the result cache
+        # until the next write
+        streaming = request.GET.get('stream', '').lower() == 'true'
+        version = CollectionVersion.current()
+        not_modified = collection_not_modified(request, version)
+        if not_modified is not None:
+            return not_modified
+        if not streaming:
+            cache_key = result_cache.key(request, version)
+            data = result_cache.get(cache_key)
+            if data is not None:
+                return collection_response(cached_response(data), version)
+        
+        analyses, rows = list_rows(request, fields, streaming)
         
         # Apply filters
         filters_applied = {}
@@ -144,42 +367,203 @@ class StringsView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
         
-        # Character containment filter
+        # Character containment filters, answered from the character index
+        min_character_count = request.GET.get('min_character_count')
+        if min_character_count:
+            try:
+                min_character_count = int(min_character_count)
+            except ValueError:
+                return Response(
+                    {'error': 'Invalid min_character_count parameter'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
         contains_character = request.GET.get('contains_character')
         if contains_character and len(contains_character) == 1:
-            analyses = analyses.filter(value__icontains=contains_character)
+            analyses = analyses.containing(contains_character, min_character_count or 1)
             filters_applied['contains_character'] = contains_character
+            if min_character_count:
+                filters_applied['min_character_count'] = min_character_count
+        
+        contains_all = request.GET.get('contains_all')
+        if contains_all:
+            analyses = analyses.containing_all(contains_all)
+            filters_applied['contains_all'] = contains_all
+        
+        if streaming:
+            return collection_response(
+                streaming_response(analyses, fields, filters_applied=filters_applied), version
+            )
+        
+        try:
+            page, pagination = paginate(analyses, request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        data = list_body(page, rows, fields, {**pagination, 'filters_applied': filters_applied})
+        result_cache.set(cache_key, data)
+        return collection_response(cached_response(data), version)
+
+class AnalyzeView(APIView):
+    """Handle POST for /analyze endpoint - analysis only, nothing is stored"""
+    
+    # No session or user lookups either, so the endpoint never touches the
+    # database and scales with the number of web workers
+    authentication_classes = []
+    permission_classes = []
+    
+    def post(self, request):
+        """POST /analyze - Analyze {"value": ...} or a batch {"values": [...]}."""
+        
+        properties = request.GET.get('properties')
+        if properties:
+            try:
+                properties = parse_property_names(properties)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            properties = None
+        
+        if 'values' in request.data:
+            return self.analyze_batch(request.data['values'], properties)
+        
+        if 'value' not in request.data:
+            return Response(
+                {'error': 'Missing "value" field'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not isinstance(request.data['value'], str):
+            return Response(
+                {'error': 'Invalid data type for "value" (must be string)'}, 
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        
+        value = request.data['value'].strip()
+        if not value:
+            return Response(
+                {'error': 'String value cannot be empty'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(self.analysis_data(value, compute_string_properties_cached(value, properties)))
+    
+    def analyze_batch(self, values, properties):
+        if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+            return Response(
+                {'error': 'Invalid data type for "values" (must be a list of strings)'}, 
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
         
-        serializer = StringAnalysisSerializer(analyses, many=True)
+        if len(values) > settings.STRING_ANALYZE_MAX_BATCH:
+            return Response(
+                {'error': f'At most {settings.STRING_ANALYZE_MAX_BATCH} values per batch'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
+        values = [value.strip() for value in values]
+        if not all(values):
+            return Response(
+                {'error': 'String value cannot be empty'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        results = compute_string_properties_batch(values, properties=properties)
         return Response({
-            'data': serializer.data,
-            'count': analyses.count(),
-            'filters_applied': filters_applied
+            'data': [self.analysis_data(value, result) for value, result in zip(values, results)],
+            'count': len(values)
         })
+    
+    def analysis_data(self, value, properties):
+        """Same id/value/properties shape as StringAnalysisSerializer, minus created_at."""
+        data = {'value': value, 'properties': response_properties(properties)}
+        if 'sha256_hash' in properties:
+            data = {'id': properties['sha256_hash'], **data}
+        return data
 
 class StringDetailView(APIView):
     """Handle GET and DELETE for /strings/{string_value} endpoint"""
     
-    def get(self, request, string_value):
+    def get_analysis_id(self):
+        """Rows are keyed by the SHA-256 of their value, so hash the path."""
+        return StringAnalysis.id_for_value(self.kwargs['string_value'])
+    
+    def get(self, request, **kwargs):
         """GET /strings/{string_value} - Get specific string analysis."""
         
         try:
-            analysis = get_object_or_404(StringAnalysis, value=string_value)
-            serializer = StringAnalysisSerializer(analysis)
-            return Response(serializer.data)
+            fields = requested_fields(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Whole JSON bodies are cached per worker; projections and other
+        # renderers (the browsable API) always go to the database
+        analysis_id = self.get_analysis_id()
+        cacheable = fields is None and request.accepted_renderer.format == 'json'
+        cached = get_detail_payload(analysis_id) if cacheable else None
+        
+        # A row never changes under its id (the hash of its value), so
+        # If-None-Match only needs the row's created_at. That is read even
+        # with a cached body: a delete in another worker only cleared that
+        # worker's LRU
+        if 'If-None-Match' in request.headers:
+            created_at = StringAnalysis.objects.filter(pk=analysis_id).values_list('created_at', flat=True).first()
+            etag = detail_etag(analysis_id, created_at) if created_at is not None else None
+            if cached is not None and cached[0] != etag:
+                delete_detail_payload(analysis_id)
+                cached = None
+            if etag is not None:
+                not_modified = get_conditional_response(request, etag=etag)
+                if not_modified is not None:
+                    return detail_response(not_modified, etag)
+        if cached is not None:
+            etag, payload = cached
+            return detail_response(HttpResponse(payload, content_type='application/json'), etag)
+        
+        try:
+            if cacheable:
+                row = get_object_or_404(
+                    StringAnalysis.objects.values_list(*RENDERED_COLUMNS, named=True), pk=analysis_id
+                )
+                payloads = rendered_payloads([row])
+                if not payloads:
+                    # Deleted, or appended to (which moves its id), while
+                    # its JSON was being rendered
+                    return Response(
+                        {'error': 'String does not exist in the system'}, 
+                        status=status.HTTP_404_NOT_FOUND
+                    )
+                etag = detail_etag(analysis_id, row.created_at)
+                put_detail_payload(analysis_id, etag, payloads[0])
+                return detail_response(HttpResponse(payloads[0], content_type='application/json'), etag)
+            if request.accepted_renderer.format == 'json':
+                row = get_object_or_404(
+                    StringAnalysis.objects.values_list(*row_columns(fields), named=True), pk=analysis_id
+                )
+                payload = dumps(row_data(row, fields))
+                return detail_response(
+                    HttpResponse(payload, content_type='application/json'), detail_etag(analysis_id, row.created_at)
+                )
+            analysis = get_object_or_404(
+                only_fields(StringAnalysis.objects.all(), fields), pk=analysis_id
+            )
+            serializer = StringAnalysisSerializer(analysis, fields=fields)
+            return detail_response(Response(serializer.data), detail_etag(analysis_id, analysis.created_at))
         except StringAnalysis.DoesNotExist:
             return Response(
                 {'error': 'String does not exist in the system'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
     
-    def delete(self, request, string_value):
+    def delete(self, request, **kwargs):
         """DELETE /strings/{string_value} - Delete string analysis."""
         
         try:
-            analysis = get_object_or_404(StringAnalysis, value=string_value)
-            analysis.delete()
+            analysis_id = self.get_analysis_id()
+            analysis = get_object_or_404(StringAnalysis, pk=analysis_id)
+            with transaction.atomic():
+                analysis.delete()
+                CollectionVersion.bump()
+            delete_detail_payload(analysis_id)
             return Response(status=status.HTTP_204_NO_CONTENT)
         except StringAnalysis.DoesNotExist:
             return Response(
@@ -187,6 +571,183 @@ class StringDetailView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+class StringByIdView(StringDetailView):
+    """Handle GET and DELETE for /strings/id/{sha256} endpoint, for callers
+    that have the hash and should not send the full value in the URL"""
+    
+    def get_analysis_id(self):
+        return self.kwargs['sha256']
+
+class StringAppendView(APIView):
+    """Handle PATCH for /strings/{string_value}/append endpoint"""
+    
+    def patch(self, request, string_value):
+        """PATCH /strings/{string_value}/append - Append a fragment to a stored string.
+        
+        The stored properties are updated from the fragment alone: the
+        frequency map and counts are merged and the SHA-256 is resumed from
+        its saved state. The full value is never loaded; is_palindrome is
+        cleared and recomputed the next time the row is read.
+        
+        The state is saved by the first append. Values over
+        STRING_APPEND_INLINE_HASH_BYTES get it computed in the background
+        and a 503 with Retry-After rather than being hashed during the
+        request.
+        """
+        
+        if 'value' not in request.data:
+            return Response(
+                {'error': 'Missing "value" field'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        fragment = request.data['value']
+        if not isinstance(fragment, str):
+            return Response(
+                {'error': 'Invalid data type for "value" (must be string)'}, 
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        
+        if not fragment:
+            return Response(
+                {'error': 'Fragment cannot be empty'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        old_id = StringAnalysis.id_for_value(string_value)
+        analysis = StringAnalysis.objects.defer('value').filter(id=old_id).first()
+        if analysis is None:
+            return Response(
+                {'error': 'String does not exist in the system'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        if analysis.frequency_map_mode != 'exact':
+            return Response(
+                {'error': 'Appending requires an exact character frequency map'}, 
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        
+        # The state is saved by the first append. Short values are hashed
+        # from the URL; longer ones would hold the worker too long, so their
+        # state is computed in the background and the client retries.
+        if analysis.sha256_state:
+            digest = ResumableSHA256.from_state(analysis.sha256_state)
+        else:
+            encoded = string_value.encode('utf-8')
+            if len(encoded) > settings.STRING_APPEND_INLINE_HASH_BYTES:
+                store_sha256_state_in_background(old_id)
+                response = Response(
+                    {'error': 'String is still being prepared for appends, retry shortly'}, 
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE
+                )
+                # The pure-Python SHA-256 does roughly 250 KB/s
+                response['Retry-After'] = str(max(1, len(encoded) // 250_000))
+                return response
+            digest = ResumableSHA256(encoded)
+        digest.update(fragment.encode('utf-8'))
+        new_id = digest.hexdigest()
+        
+        properties = append_string_properties(
+            {
+                'length': analysis.length,
+                'word_count': analysis.word_count,
+                'character_frequency_map': analysis.character_frequency_map,
+            },
+            fragment,
+            ends_in_word=not string_value[-1:].isspace(),
+            sha256_hash=new_id,
+        )
+        
+        if StringAnalysis.objects.filter(id=new_id).exists():
+            return Response(
+                {'error': 'String already exists in the system'}, 
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        # The id is the content hash, so it changes with the value; the
+        # concatenation happens in the database
+        try:
+            with transaction.atomic():
+                moved = self.update_row(old_id, new_id, fragment, properties, digest)
+        except IntegrityError:
+            return Response(
+                {'error': 'String already exists in the system'}, 
+                status=status.HTTP_409_CONFLICT
+            )
+        if not moved:
+            # The row left old_id after it was read: deleted, or moved by
+            # another append that committed first
+            if self.appended_elsewhere(string_value):
+                return Response(
+                    {'error': 'String was changed by another append; retry with its new value'}, 
+                    status=status.HTTP_409_CONFLICT
+                )
+            return Response(
+                {'error': 'String does not exist in the system'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        delete_detail_payload(old_id)
+        
+        return Response({
+            'id': new_id,
+            'properties': properties,
+            'created_at': serializers.DateTimeField().to_representation(analysis.created_at)
+        })
+    
+    def update_row(self, old_id, new_id, fragment, properties, digest):
+        """Move the row to its new id and fold the fragment into its
+        character index rows. False if there is no row at old_id any more."""
+        updated = StringAnalysis.objects.filter(id=old_id).update(
+            id=new_id,
+            value=Concat(F('value'), Value(fragment), output_field=TextField()),
+            length=properties['length'],
+            is_palindrome=None,
+            unique_characters=properties['unique_characters'],
+            word_count=properties['word_count'],
+            character_frequency_data=pack_frequency_map(properties['character_frequency_map']),
+            sha256_state=digest.get_state(),
+            rendered_json=None,
+            character_mask=character_class_mask(properties['character_frequency_map']),
+        )
+        if not updated:
+            return False
+        CharacterOccurrence.objects.filter(string_id=old_id).update(string_id=new_id)
+        
+        fragment_counts = fold_frequency_map(
+            compute_string_properties(fragment, ['character_frequency_map'])['character_frequency_map']
+        )
+        existing = set(
+            CharacterOccurrence.objects.filter(string_id=new_id, character__in=fragment_counts)
+            .values_list('character', flat=True)
+        )
+        for char in existing:
+            CharacterOccurrence.objects.filter(string_id=new_id, character=char).update(
+                count=F('count') + fragment_counts[char]
+            )
+        CharacterOccurrence.objects.bulk_create(
+            CharacterOccurrence(string_id=new_id, character=char, count=count)
+            for char, count in fragment_counts.items()
+            if char not in existing
+        )
+        CollectionVersion.bump()
+        return True
+    
+    def appended_elsewhere(self, string_value):
+        """Whether a longer stored string starts with string_value, as one
+        moved there by a concurrent append would.
+        
+        This scans the longer rows, so it is only asked after an append
+        lost a race. The prefix is compared exactly; LIKE would ignore case
+        on SQLite.
+        """
+        return (
+            StringAnalysis.objects.filter(length__gt=len(string_value))
+            .annotate(prefix=Substr('value', 1, len(string_value)))
+            .filter(prefix=string_value)
+            .exists()
+        )
+
 @api_view(['GET'])
 def natural_language_filter(request):
     """GET /strings/filter-by-natural-language - Filter using natural language."""
@@ -198,6 +759,22 @@ def natural_language_filter(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
+    try:
+        fields = requested_fields(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    streaming = request.GET.get('stream', '').lower() == 'true'
+    version = CollectionVersion.current()
+    not_modified = collection_not_modified(request, version)
+    if not_modified is not None:
+        return not_modified
+    if not streaming:
+        cache_key = result_cache.key(request, version)
+        data = result_cache.get(cache_key)
+        if data is not None:
+            return collection_response(cached_response(data), version)
+    
     print(f"🎯 Natural Language Query: '{query}'")
     
     try:
@@ -212,8 +789,7 @@ def natural_language_filter(request):
                 )
         
         # Apply filters
-        analyses = StringAnalysis.objects.all()
-        initial_count = analyses.count()
+        analyses, rows = list_rows(request, fields, streaming)
         
         if 'is_palindrome' in parsed_filters:
             analyses = analyses.filter(is_palindrome=parsed_filters['is_palindrome'])
@@ -232,22 +808,33 @@ def natural_language_filter(request):
             print(f"  Applied word_count filter: {parsed_filters['word_count']}")
         
         if 'contains_character' in parsed_filters:
-            analyses = analyses.filter(value__icontains=parsed_filters['contains_character'])
+            analyses = analyses.containing(
+                parsed_filters['contains_character'], parsed_filters.get('min_character_count', 1)
+            )
             print(f"  Applied contains_character filter: '{parsed_filters['contains_character']}'")
         
-        final_count = analyses.count()
-        print(f"  Results: {final_count}/{initial_count} strings match")
+        if 'contains_all' in parsed_filters:
+            analyses = analyses.containing_all(parsed_filters['contains_all'])
+            print(f"  Applied contains_all filter: '{parsed_filters['contains_all']}'")
         
-        serializer = StringAnalysisSerializer(analyses, many=True)
+        interpreted_query = {
+            'original': query,
+            'parsed_filters': parsed_filters
+        }
+        if streaming:
+            return collection_response(
+                streaming_response(analyses, fields, interpreted_query=interpreted_query), version
+            )
         
-        return Response({
-            'data': serializer.data,
-            'count': analyses.count(),
-            'interpreted_query': {
-                'original': query,
-                'parsed_filters': parsed_filters
-            }
-        })
+        try:
+            page, pagination = paginate(analyses, request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        print(f"  Results: {pagination['count']} strings match")
+        
+        data = list_body(page, rows, fields, {**pagination, 'interpreted_query': interpreted_query})
+        result_cache.set(cache_key, data)
+        return collection_response(cached_response(data), version)
         
     except Exception as e:
         print(f"❌ Error in natural language filter: {e}")
@@ -256,4 +843,16 @@ def natural_language_filter(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-        
\ No newline at end of file
+        
+
+
+@api_view(['GET'])
+def cache_stats(request):
+    """GET /cache/stats - Hit ratios of this worker's caches."""
+    
+    return Response({
+        'properties': properties_cache.stats(),
+        'results': result_cache.stats(),
+        'details': detail_cache.stats(),
+        'shared_details': shared_detail_cache.stats() if shared_detail_cache is not None else None,
+    })